@@ -1,28 +1,32 @@
 # app_complete.py - Stock Risk Advisor with enhanced UX
 import os
-import json
 import csv
-import io
+import copy
+import json
+import math
+import queue
+import atexit
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
 from datetime import datetime
-from io import BytesIO
+from types import MappingProxyType
+from io import StringIO
 
-import numpy as np
 import pandas as pd
 import streamlit as st
 import plotly.graph_objects as go
-import plotly.express as px
-
-# Import for PDF generation
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.lib import colors
 
 # -------------------------
 # CONFIG / TUNABLE CONSTANTS
 # -------------------------
 MINIMUM_INVESTMENT_THRESHOLD = 500          # rupees
 LOW_INVESTMENT_CONFIDENCE_THRESH = 1000    # rupees threshold used in confidence
+SAVE_REPORT_TIMEOUT = 2.0                  # seconds a run waits for its session's queued save
 DEFAULT_PAGE_TITLE = "Stock Risk Advisor"
+# App pages in navigation order, with each page's position
+TABS = ("Welcome", "Assessment", "Financial Health", "Risk Profile", "Recommendations", "Action Plan", "Data & Export")
+TAB_INDEX = MappingProxyType({tab: index for index, tab in enumerate(TABS)})
+N_TABS = len(TABS)
 ALLOCATION_TO_DB = {
     "Large_Cap": "Large Cap Blue Chip",
     "Mid_Cap": "Mid Cap",
@@ -39,64 +43,184 @@ WEIGHTS = {
 
 # CSV file for storing assessment data
 CSV_FILE = "assessments_data.csv"
+CSV_FIELDNAMES = (
+    'timestamp', 'monthly_income', 'monthly_expenses', 'emergency_fund', 'high_interest_debt',
+    'age_group', 'investment_purpose', 'time_horizon', 'risk_behavior', 'experience',
+    'goal_priority', 'loss_capacity', 'liquidity_need', 'financial_health_score', 'risk_category',
+    'total_risk_score', 'monthly_investment', 'annual_investment', 'confidence_score', 'contradictions',
+    'portfolio_large_cap', 'portfolio_mid_cap', 'portfolio_small_cap', 'portfolio_growth'
+)
+# Rows are numbers plus fixed category labels (no commas/quotes), so they are joined directly
+# instead of going through csv quoting. "\r\n" matches csv.writer's default line terminator.
+_CSV_LINE_END = "\r\n"
+_CSV_HEADER = ",".join(CSV_FIELDNAMES) + _CSV_LINE_END
+_CSV_HEADER_SIZE = len(_CSV_HEADER.encode('utf-8'))
+# Explicit read_csv dtypes, so pandas skips per-column type inference. Integer columns
+# are nullable (Int64) so a legacy row with an empty cell loads as <NA> instead of failing
+_CSV_DTYPES = {
+    'timestamp': str, 'monthly_income': 'float64', 'monthly_expenses': 'float64',
+    'emergency_fund': 'Int64', 'high_interest_debt': 'float64', 'age_group': 'Int64',
+    'investment_purpose': 'Int64', 'time_horizon': 'Int64', 'risk_behavior': 'Int64',
+    'experience': 'Int64', 'goal_priority': 'Int64', 'loss_capacity': 'Int64',
+    'liquidity_need': 'Int64', 'financial_health_score': 'float64', 'risk_category': 'category',
+    'total_risk_score': 'float64', 'monthly_investment': 'float64', 'annual_investment': 'float64',
+    'confidence_score': 'Int64', 'contradictions': 'Int64', 'portfolio_large_cap': 'Int64',
+    'portfolio_mid_cap': 'Int64', 'portfolio_small_cap': 'Int64', 'portfolio_growth': 'Int64'
+}
+# Columns kept in the sidebar statistics' recent_assessments records
+_STATS_COLUMNS = ('timestamp', 'financial_health_score', 'risk_category', 'monthly_investment')
+
+def _ensure_csv_header():
+    """Create CSV_FILE with its header row if it does not exist yet, so saves only ever append rows"""
+    try:
+        # O_EXCL: concurrent sessions cannot both write the header
+        fd = os.open(CSV_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    except FileExistsError:
+        return
+    try:
+        os.write(fd, _CSV_HEADER.encode('utf-8'))
+    finally:
+        os.close(fd)
+
+@st.cache_resource(show_spinner=False)
+def _init_storage():
+    """One-time setup of the export folder and CSV header (per process, not per rerun)"""
+    os.makedirs("exports", exist_ok=True)
+    _ensure_csv_header()
 
-# Create directories if they don't exist
-os.makedirs("exports", exist_ok=True)
+_init_storage()
+
+def format_timestamp(now, seconds=True):
+    """Format a datetime as 'YYYY-MM-DD HH:MM[:SS]' without going through strftime"""
+    stamp = f"{now.year:04d}-{now.month:02d}-{now.day:02d} {now.hour:02d}:{now.minute:02d}"
+    return f"{stamp}:{now.second:02d}" if seconds else stamp
+
+def format_assessment_id(now):
+    """Format a datetime as the 'YYYYMMDD_HHMMSS' assessment id used in export file names"""
+    return f"{now.year:04d}{now.month:02d}{now.day:02d}_{now.hour:02d}{now.minute:02d}{now.second:02d}"
 
 # -------------------------
 # PDF GENERATOR CLASS
 # -------------------------
+# Age-group label per 1-5 age answer, as printed in the report
+_PDF_AGE_GROUPS = MappingProxyType({
+    1: "56-65+ years",
+    2: "46-55 years",
+    3: "36-45 years",
+    4: "25-35 years",
+    5: "Under 25 years"
+})
+
 class AssessmentPDF:
     def __init__(self, assessment_data):
+        # ReportLab is imported on first use so sessions that never export skip its import cost
+        from reportlab.pdfgen import canvas
+        from reportlab.lib.pagesizes import letter
+        
         self.assessment_data = assessment_data
-        self.buffer = io.BytesIO()
-        self.pdf = canvas.Canvas(self.buffer, pagesize=letter)
+        # No output file: generate_pdf() takes the finished document with getpdfdata().
+        # Page streams are always Flate-compressed, whatever the local rl_config says
+        self.pdf = canvas.Canvas(None, pagesize=letter, pageCompression=1)
         self.width, self.height = letter
+        # Last font / fill colour set on the page stream, so repeated draws skip redundant operators
+        self._cur_font = None
+        self._cur_fill = None
+        self.define_static_forms()
+        
+    def set_font(self, name, size):
+        if (name, size) != self._cur_font:
+            self.pdf.setFont(name, size)
+            self._cur_font = (name, size)
+    
+    def set_fill(self, r, g, b):
+        if (r, g, b) != self._cur_fill:
+            self.pdf.setFillColorRGB(r, g, b)
+            self._cur_fill = (r, g, b)
         
-    def draw_header(self):
+    def define_static_forms(self):
+        """Record the static report chrome once as form XObjects (drawn with doForm)"""
+        # Forms belong to a single canvas/document, so they are defined per report
+        self.pdf.beginForm("header")
         self.pdf.setFont("Helvetica-Bold", 16)
         self.pdf.drawCentredString(self.width/2, self.height - 50, "Stock Risk Advisor - Assessment Report")
-        self.pdf.setFont("Helvetica", 10)
-        self.pdf.drawCentredString(self.width/2, self.height - 70, 
-                                  f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M')}")
         self.pdf.line(50, self.height - 80, self.width - 50, self.height - 80)
+        self.pdf.endForm()
+        
+        # Disclaimer is laid out relative to its first baseline; placed with translate()
+        self.pdf.beginForm("disclaimer", lowery=-25, uppery=15)
+        self.pdf.setFont("Helvetica-Oblique", 10)
+        self.pdf.drawString(50, 0, "Disclaimer: This report is for educational purposes only.")
+        self.pdf.drawString(50, -15, "We are not SEBI-registered investment advisors. This is not financial advice.")
+        self.pdf.endForm()
+        
+    def draw_header(self, generated_on):
+        self.pdf.doForm("header")
+        self.set_font("Helvetica", 10)
+        self.pdf.drawCentredString(self.width/2, self.height - 70, f"Generated on: {generated_on}")
+        
+    def draw_disclaimer(self, y_position):
+        self.pdf.saveState()
+        self.pdf.translate(0, y_position)
+        self.pdf.doForm("disclaimer")
+        self.pdf.restoreState()
+        return y_position - 15
         
     def draw_section_title(self, title, y_position):
-        self.pdf.setFont("Helvetica-Bold", 14)
-        self.pdf.setFillColorRGB(0.2, 0.4, 0.8)
+        self.set_font("Helvetica-Bold", 14)
+        self.set_fill(0.2, 0.4, 0.8)
         self.pdf.drawString(50, y_position, title)
-        self.pdf.setFillColorRGB(0, 0, 0)
+        self.set_fill(0, 0, 0)
         return y_position - 20
     
     def draw_key_value(self, key, value, y_position, indent=0):
-        self.pdf.setFont("Helvetica-Bold", 12)
-        self.pdf.drawString(50 + indent, y_position, f"{key}:")
-        self.pdf.setFont("Helvetica", 12)
-        self.pdf.drawString(150 + indent, y_position, str(value))
+        # Key and value share one text object. It switches to bold for the key and
+        # ends on the regular canvas font, so set_font's tracked state stays right.
+        self.set_font("Helvetica", 12)
+        text = self.pdf.beginText(50 + indent, y_position)
+        text.setFont("Helvetica-Bold", 12)
+        text.textOut(f"{key}:")
+        text.setFont("Helvetica", 12)
+        text.setTextOrigin(150 + indent, y_position)
+        text.textOut(str(value))
+        self.pdf.drawText(text)
         return y_position - 20
     
     def draw_bullet_point(self, text, y_position, indent=20):
-        self.pdf.setFont("Helvetica", 12)
+        self.set_font("Helvetica", 12)
         self.pdf.drawString(50 + indent, y_position, f"• {text}")
         return y_position - 15
     
     def draw_checklist_item(self, text, y_position, indent=20):
-        self.pdf.setFont("Helvetica", 12)
+        self.set_font("Helvetica", 12)
         self.pdf.drawString(50 + indent, y_position, f"✓ {text}")
         return y_position - 15
     
     def generate_pdf(self):
         y_position = self.height - 100
+        generated_on = format_timestamp(datetime.now(), seconds=False)
+        
+        data = self.assessment_data
+        answers = data['answers']
+        financial_data = data.get('financial_data', {})
+        risk_scores = data.get('risk_scores', {})
+        investment_data = data.get('investment_data', {})
+        allocation = data.get('allocation', {})
+        monthly_investment = investment_data.get('safe_monthly_investment', 0)
+        monthly_ef_saving = investment_data.get('monthly_ef_saving', 0)
+        monthly_debt_payment = investment_data.get('monthly_debt_payment', 0)
+        # Amounts shown in both the Action Plan and the Monthly Checklist
+        investment_str = f"₹ {monthly_investment:,.2f}"
+        ef_saving_str = f"₹ {monthly_ef_saving:,.2f}"
+        debt_payment_str = f"₹ {monthly_debt_payment:,.2f}"
         
         # Header
-        self.draw_header()
+        self.draw_header(generated_on)
         y_position -= 30
         
         # Personal Information
         y_position = self.draw_section_title("Personal Information", y_position)
         
-        answers = self.assessment_data['answers']
-        y_position = self.draw_key_value("Assessment Date", datetime.now().strftime('%Y-%m-%d %H:%M'), y_position)
+        y_position = self.draw_key_value("Assessment Date", generated_on, y_position)
         y_position = self.draw_key_value("Monthly Income", f"₹ {answers.get('monthly_income', 0):,.2f}", y_position)
         y_position = self.draw_key_value("Monthly Expenses", f"₹ {answers.get('monthly_expenses', 0):,.2f}", y_position)
         y_position = self.draw_key_value("Age Group", self.get_age_group(answers.get('age', 3)), y_position)
@@ -105,7 +229,6 @@ class AssessmentPDF:
         y_position -= 10
         y_position = self.draw_section_title("Financial Health Score", y_position)
         
-        financial_data = self.assessment_data.get('financial_data', {})
         y_position = self.draw_key_value("Overall Score", f"{financial_data.get('financial_health_score', 0)}/100", y_position)
         y_position = self.draw_key_value("Monthly Disposable", f"₹ {financial_data.get('disposable_income', 0):,.2f}", y_position)
         y_position = self.draw_key_value("Debt Ratio", f"{financial_data.get('debt_ratio', 0):.2%}", y_position)
@@ -114,25 +237,22 @@ class AssessmentPDF:
         y_position -= 10
         y_position = self.draw_section_title("Risk Profile", y_position)
         
-        risk_scores = self.assessment_data.get('risk_scores', {})
-        y_position = self.draw_key_value("Risk Category", self.assessment_data.get('risk_category', 'N/A'), y_position)
+        y_position = self.draw_key_value("Risk Category", data.get('risk_category', 'N/A'), y_position)
         y_position = self.draw_key_value("Total Risk Score", f"{risk_scores.get('total_score', 0)}/90", y_position)
         
         # Investment Recommendations
         y_position -= 10
         y_position = self.draw_section_title("Investment Recommendations", y_position)
         
-        investment_data = self.assessment_data.get('investment_data', {})
-        y_position = self.draw_key_value("Monthly Investment", f"₹ {investment_data.get('safe_monthly_investment', 0):,.2f}", y_position)
+        y_position = self.draw_key_value("Monthly Investment", investment_str, y_position)
         y_position = self.draw_key_value("Annual Investment", f"₹ {investment_data.get('annual_investment', 0):,.2f}", y_position)
         
         # Portfolio Allocation
         y_position -= 10
         y_position = self.draw_section_title("Portfolio Allocation", y_position)
         
-        allocation = self.assessment_data.get('allocation', {})
         for category, percentage in allocation.items():
-            amount = (percentage / 100.0) * investment_data.get('safe_monthly_investment', 0)
+            amount = (percentage / 100.0) * monthly_investment
             y_position = self.draw_key_value(f"{category}", f"{percentage}% (₹ {amount:,.2f}/month)", y_position, indent=10)
         
         # Action Plan
@@ -140,113 +260,267 @@ class AssessmentPDF:
         y_position = self.draw_section_title("Action Plan", y_position)
         
         if investment_data.get('ef_gap_amount', 0) > 0:
-            y_position = self.draw_bullet_point(f"Build Emergency Fund: Save ₹ {investment_data.get('monthly_ef_saving', 0):,.2f}/month for {investment_data.get('ef_build_timeline', 0)} months", y_position)
+            y_position = self.draw_bullet_point(f"Build Emergency Fund: Save {ef_saving_str}/month for {investment_data.get('ef_build_timeline', 0)} months", y_position)
         
         if answers.get('high_interest_debt', 0) > 0:
-            y_position = self.draw_bullet_point(f"Pay High-Interest Debt: Minimum ₹ {investment_data.get('monthly_debt_payment', 0):,.2f}/month", y_position)
+            y_position = self.draw_bullet_point(f"Pay High-Interest Debt: Minimum {debt_payment_str}/month", y_position)
         
-        if investment_data.get('safe_monthly_investment', 0) > 0:
-            y_position = self.draw_bullet_point(f"Start Investing: ₹ {investment_data.get('safe_monthly_investment', 0):,.2f}/month as per allocation", y_position)
+        if monthly_investment > 0:
+            y_position = self.draw_bullet_point(f"Start Investing: {investment_str}/month as per allocation", y_position)
         
         # Monthly Checklist
         y_position -= 10
         y_position = self.draw_section_title("Monthly Checklist", y_position)
         
-        if investment_data.get('monthly_ef_saving', 0) > 0:
-            y_position = self.draw_checklist_item(f"Save ₹ {investment_data.get('monthly_ef_saving', 0):,.2f} for emergency fund", y_position)
+        if monthly_ef_saving > 0:
+            y_position = self.draw_checklist_item(f"Save {ef_saving_str} for emergency fund", y_position)
         
-        if investment_data.get('monthly_debt_payment', 0) > 0:
-            y_position = self.draw_checklist_item(f"Pay ₹ {investment_data.get('monthly_debt_payment', 0):,.2f} towards high-interest debt", y_position)
+        if monthly_debt_payment > 0:
+            y_position = self.draw_checklist_item(f"Pay {debt_payment_str} towards high-interest debt", y_position)
         
-        if investment_data.get('safe_monthly_investment', 0) > 0:
-            y_position = self.draw_checklist_item(f"Invest ₹ {investment_data.get('safe_monthly_investment', 0):,.2f} as per allocation", y_position)
+        if monthly_investment > 0:
+            y_position = self.draw_checklist_item(f"Invest {investment_str} as per allocation", y_position)
         
         # Disclaimer
         y_position -= 20
-        self.pdf.setFont("Helvetica-Oblique", 10)
-        self.pdf.drawString(50, y_position, "Disclaimer: This report is for educational purposes only.")
-        y_position -= 15
-        self.pdf.drawString(50, y_position, "We are not SEBI-registered investment advisors. This is not financial advice.")
+        y_position = self.draw_disclaimer(y_position)
         
-        # Save the PDF
-        self.pdf.save()
-        
-        # Get the PDF bytes
-        self.buffer.seek(0)
-        return self.buffer
+        # Finish the PDF and return its bytes
+        return self.pdf.getpdfdata()
     
     @staticmethod
     def get_age_group(age_score):
-        age_map = {
-            1: "56-65+ years",
-            2: "46-55 years",
-            3: "36-45 years",
-            4: "25-35 years",
-            5: "Under 25 years"
-        }
-        return age_map.get(age_score, "Unknown")
+        return _PDF_AGE_GROUPS.get(age_score, "Unknown")
 
 # -------------------------
 # CSV DATA HANDLER
 # -------------------------
+@st.cache_resource(show_spinner=False)
+def _get_csv_appender():
+    """Long-lived O_APPEND descriptor for CSV_FILE, shared across reruns"""
+    fd = os.open(CSV_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    appender = {'fd': fd, 'lock': threading.Lock()}
+    # Closed by the writer's exit hook, only after the queued rows have been written
+    _get_csv_writer()['appenders'].append(appender)
+    return appender
+
+def _release_csv_fd(appender):
+    with appender['lock']:
+        if appender['fd'] is not None:
+            os.close(appender['fd'])
+            appender['fd'] = None
+
+def _close_csv_appender():
+    """Close the cached descriptor (e.g. before the CSV file is deleted)"""
+    appender = _get_csv_appender()
+    _release_csv_fd(appender)
+    _get_csv_writer()['appenders'].remove(appender)
+    _get_csv_appender.clear()
+
+def _append_to_csv(appender, data):
+    with appender['lock']:
+        if appender['fd'] is None:
+            raise OSError("the assessment file was cleared before this save was written")
+        # One unbuffered O_APPEND write: readers see it at once and concurrent
+        # appenders cannot interleave with it
+        payload = memoryview(data.encode('utf-8'))
+        while payload:
+            payload = payload[os.write(appender['fd'], payload):]
+
+@st.cache_resource(show_spinner=False)
+def _get_csv_writer():
+    """Background thread + queue that performs CSV appends off the submit path"""
+    writer = {'queue': queue.Queue(), 'appenders': []}
+    writer['thread'] = threading.Thread(target=_csv_writer_loop, args=(writer,), name="csv-writer", daemon=True)
+    writer['thread'].start()
+    atexit.register(_stop_csv_writer, writer)
+    return writer
+
+def _csv_writer_loop(writer):
+    # No Streamlit calls here (no script run context): each item's outcome goes to
+    # its own Future, which the submitting session reports
+    pending = writer['queue']
+    while True:
+        # Saves that queued up while the last write ran go out together in one write
+        batch = [pending.get()]
+        while True:
+            try:
+                batch.append(pending.get_nowait())
+            except queue.Empty:
+                break
+        _append_csv_batch(batch)
+        if None in batch:
+            return
+
+def _append_csv_batch(batch):
+    """Join consecutive (appender, data, future) items that share a descriptor into one append"""
+    run_appender, run = None, []
+    for item in batch:
+        if item is None:  # shutdown sentinel
+            break
+        if run and item[0] is not run_appender:
+            _append_csv_run(run_appender, run)
+            run = []
+        run_appender = item[0]
+        run.append(item)
+    if run:
+        _append_csv_run(run_appender, run)
+
+def _append_csv_run(appender, run):
+    try:
+        _append_to_csv(appender, "".join(data for _, data, _ in run))
+    except Exception as e:
+        for _, _, future in run:
+            future.set_exception(e)
+    else:
+        for _, _, future in run:
+            future.set_result(True)
+
+def _stop_csv_writer(writer):
+    """Exit hook: let the writer drain the queue, then close the descriptors it wrote through"""
+    # One hook does both in order; separate hooks would run LIFO and close the
+    # descriptors while rows are still queued for them
+    writer['queue'].put(None)
+    writer['thread'].join()
+    for appender in writer['appenders']:
+        _release_csv_fd(appender)
+    # Saves that raced in behind the sentinel will never be written; fail them so
+    # nobody waits on them
+    while True:
+        try:
+            item = writer['queue'].get_nowait()
+        except queue.Empty:
+            break
+        if item is not None:
+            item[2].set_exception(RuntimeError("the CSV writer has stopped"))
+
+def _csv_signature():
+    """(mtime_ns, size) of CSV_FILE, or None when it is missing or empty"""
+    # Taken from the file as it is now: this session's own save was already awaited by
+    # report_pending_save, and other sessions' in-flight rows show up on a later rerun
+    try:
+        stat = os.stat(CSV_FILE)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size) if stat.st_size > 0 else None
+
+# The signature argument only keys the caches: any append changes it, so a stale
+# DataFrame is never served and reruns without new data skip the parse entirely.
+# Only the current file version is ever asked for again, so each cache keeps one entry.
+@st.cache_data(show_spinner=False, max_entries=1)
+def _read_assessments_csv(signature):
+    df = pd.read_csv(CSV_FILE, usecols=lambda column: column in _CSV_DTYPES, dtype=_CSV_DTYPES)
+    # Columns that an older file lacks come back empty rather than failing the whole load
+    df = df.reindex(columns=list(_CSV_DTYPES))
+    # Timestamps are parsed once here with their fixed format, not on every render; a
+    # malformed one becomes NaT so the column keeps its datetime dtype
+    df['timestamp'] = pd.to_datetime(df['timestamp'], format='%Y-%m-%d %H:%M:%S', errors='coerce')
+    return df
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def _read_csv_bytes(signature):
+    """Raw CSV_FILE contents for download buttons (served as-is, no decode pass)"""
+    with open(CSV_FILE, 'rb') as file:
+        return file.read()
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def _assessment_statistics(signature):
+    # Reduce the frame already parsed for this signature instead of re-reading the file
+    df = _read_assessments_csv(signature)[list(_STATS_COLUMNS)]
+    if df.empty:
+        return None
+    
+    # Both means in one reduction. Counts in category order make idxmax pick the
+    # same tie-winner as mode().iloc[0]
+    means = df[['financial_health_score', 'monthly_investment']].mean()
+    risk_counts = df['risk_category'].value_counts(sort=False)
+    stats = {
+        'total_assessments': len(df),
+        'avg_financial_health': means['financial_health_score'],
+        'most_common_risk_category': risk_counts.idxmax() if risk_counts.any() else 'N/A',
+        'avg_monthly_investment': means['monthly_investment'],
+        'recent_assessments': df.tail(5).to_dict('records')
+    }
+    return stats
+
 class CSVDataHandler:
     @staticmethod
-    def save_assessment_to_csv(assessment_data):
-        """Save assessment data to CSV file"""
+    def _format_csv_row(assessment_data, timestamp):
+        """Format one assessment as a CSV line (same order as CSV_FIELDNAMES)"""
+        answers = assessment_data['answers']
+        allocation = assessment_data.get('allocation', {})
+        investment_data = assessment_data.get('investment_data', {})
+        
+        row = (
+            timestamp,
+            answers.get('monthly_income', 0),
+            answers.get('monthly_expenses', 0),
+            answers.get('emergency', 3),
+            answers.get('high_interest_debt', 0),
+            answers.get('age', 3),
+            answers.get('purpose', 3),
+            answers.get('horizon', 3),
+            answers.get('risk_behavior', 3),
+            answers.get('experience', 2),
+            answers.get('goal_priority', 2),
+            answers.get('loss_capacity', 2),
+            answers.get('liquidity_need', 2),
+            assessment_data.get('financial_data', {}).get('financial_health_score', 0),
+            assessment_data.get('risk_category', 'Unknown'),
+            assessment_data.get('risk_scores', {}).get('total_score', 0),
+            investment_data.get('safe_monthly_investment', 0),
+            investment_data.get('annual_investment', 0),
+            assessment_data.get('confidence_score', {}).get('score', 0),
+            assessment_data.get('contradictions', 0),
+            allocation.get('Large_Cap', 0),
+            allocation.get('Mid_Cap', 0),
+            allocation.get('Small_Cap', 0),
+            allocation.get('Growth', 0)
+        )
+        line = ",".join(map(str, row))
+        # Every field is a number or a plain label, so no quoting is needed; if a
+        # value ever carries a delimiter, quote or line break, let csv quote it
+        if line.count(",") != len(row) - 1 or '"' in line or "\n" in line or "\r" in line:
+            buffer = StringIO()
+            csv.writer(buffer, lineterminator=_CSV_LINE_END).writerow(row)
+            return buffer.getvalue()
+        return line + _CSV_LINE_END
+    
+    @staticmethod
+    def save_assessments_batch(assessments):
+        """Queue several assessments for a single append to the CSV file.
+
+        Returns a Future that resolves to True once the rows are written, or holds the
+        error that stopped them.
+        """
+        future = Future()
         try:
-            # Prepare data row
-            row_data = {
-                'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'monthly_income': assessment_data['answers'].get('monthly_income', 0),
-                'monthly_expenses': assessment_data['answers'].get('monthly_expenses', 0),
-                'emergency_fund': assessment_data['answers'].get('emergency', 3),
-                'high_interest_debt': assessment_data['answers'].get('high_interest_debt', 0),
-                'age_group': assessment_data['answers'].get('age', 3),
-                'investment_purpose': assessment_data['answers'].get('purpose', 3),
-                'time_horizon': assessment_data['answers'].get('horizon', 3),
-                'risk_behavior': assessment_data['answers'].get('risk_behavior', 3),
-                'experience': assessment_data['answers'].get('experience', 2),
-                'goal_priority': assessment_data['answers'].get('goal_priority', 2),
-                'loss_capacity': assessment_data['answers'].get('loss_capacity', 2),
-                'liquidity_need': assessment_data['answers'].get('liquidity_need', 2),
-                'financial_health_score': assessment_data.get('financial_data', {}).get('financial_health_score', 0),
-                'risk_category': assessment_data.get('risk_category', 'Unknown'),
-                'total_risk_score': assessment_data.get('risk_scores', {}).get('total_score', 0),
-                'monthly_investment': assessment_data.get('investment_data', {}).get('safe_monthly_investment', 0),
-                'annual_investment': assessment_data.get('investment_data', {}).get('annual_investment', 0),
-                'confidence_score': assessment_data.get('confidence_score', {}).get('score', 0),
-                'contradictions': assessment_data.get('contradictions', 0),
-                'portfolio_large_cap': assessment_data.get('allocation', {}).get('Large_Cap', 0),
-                'portfolio_mid_cap': assessment_data.get('allocation', {}).get('Mid_Cap', 0),
-                'portfolio_small_cap': assessment_data.get('allocation', {}).get('Small_Cap', 0),
-                'portfolio_growth': assessment_data.get('allocation', {}).get('Growth', 0)
-            }
-            
-            # Check if file exists to write header
-            file_exists = os.path.isfile(CSV_FILE)
+            timestamp = format_timestamp(datetime.now())
+            lines = [CSVDataHandler._format_csv_row(data, timestamp) for data in assessments]
             
-            with open(CSV_FILE, 'a', newline='', encoding='utf-8') as csvfile:
-                fieldnames = list(row_data.keys())
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                
-                if not file_exists:
-                    writer.writeheader()
-                writer.writerow(row_data)
-                
-            return True
+            # The write itself happens on the background writer thread
+            writer = _get_csv_writer()
+            if not writer['thread'].is_alive():
+                raise RuntimeError("the CSV writer has stopped")
+            writer['queue'].put((_get_csv_appender(), "".join(lines), future))
         except Exception as e:
-            st.error(f"Error saving to CSV: {str(e)}")
-            return False
+            future.set_exception(e)
+        return future
+    
+    @staticmethod
+    def save_assessment_to_csv(assessment_data):
+        """Save assessment data to CSV file"""
+        return CSVDataHandler.save_assessments_batch([assessment_data])
     
     @staticmethod
     def load_assessments_from_csv():
         """Load all assessments from CSV file"""
         try:
-            if not os.path.exists(CSV_FILE):
+            signature = _csv_signature()
+            if signature is None:
                 return pd.DataFrame()
             
-            df = pd.read_csv(CSV_FILE)
-            return df
+            return _read_assessments_csv(signature)
         except Exception as e:
             st.error(f"Error loading CSV: {str(e)}")
             return pd.DataFrame()
@@ -254,18 +528,15 @@ class CSVDataHandler:
     @staticmethod
     def get_statistics():
         """Get statistics from stored assessments"""
-        df = CSVDataHandler.load_assessments_from_csv()
-        if df.empty:
+        try:
+            signature = _csv_signature()
+            if signature is None:
+                return None
+            
+            return _assessment_statistics(signature)
+        except Exception as e:
+            st.error(f"Error loading CSV: {str(e)}")
             return None
-        
-        stats = {
-            'total_assessments': len(df),
-            'avg_financial_health': df['financial_health_score'].mean(),
-            'most_common_risk_category': df['risk_category'].mode().iloc[0] if not df['risk_category'].mode().empty else 'N/A',
-            'avg_monthly_investment': df['monthly_investment'].mean(),
-            'recent_assessments': df.tail(5).to_dict('records')
-        }
-        return stats
 
 # -------------------------
 # PAGE CONFIG
@@ -307,37 +578,34 @@ st.markdown("""
 # -------------------------
 # SESSION STATE INIT
 # -------------------------
+_SESSION_DEFAULTS = {
+    'current_tab': "Welcome",
+    # Tab to open on the next run, for redirects made after the sidebar radio was drawn
+    'next_tab': None,
+    'answers': {},
+    'risk_scores': None,
+    'risk_category': None,
+    'financial_health_score': None,
+    'safe_investment': None,
+    'override_log': [],
+    'confidence_score': None,
+    'assessment_complete': False,
+    'contradictions': 0,
+    'allocation': None,
+    'pdf_generated': False,
+    'assessment_id': None,
+    # Answers of the last submission whose row was saved
+    'answers_key': None,
+    'assessment_step': 0,
+    'debt_details': {},
+    # (answers_key, Future) of the submission whose save is still to be reported
+    'pending_save': None
+}
+
 def init_session_state():
-    if 'current_tab' not in st.session_state:
-        st.session_state.current_tab = "Welcome"
-    if 'answers' not in st.session_state:
-        st.session_state.answers = {}
-    if 'risk_scores' not in st.session_state:
-        st.session_state.risk_scores = None
-    if 'risk_category' not in st.session_state:
-        st.session_state.risk_category = None
-    if 'financial_health_score' not in st.session_state:
-        st.session_state.financial_health_score = None
-    if 'safe_investment' not in st.session_state:
-        st.session_state.safe_investment = None
-    if 'override_log' not in st.session_state:
-        st.session_state.override_log = []
-    if 'confidence_score' not in st.session_state:
-        st.session_state.confidence_score = None
-    if 'assessment_complete' not in st.session_state:
-        st.session_state.assessment_complete = False
-    if 'contradictions' not in st.session_state:
-        st.session_state.contradictions = 0
-    if 'allocation' not in st.session_state:
-        st.session_state.allocation = None
-    if 'pdf_generated' not in st.session_state:
-        st.session_state.pdf_generated = False
-    if 'assessment_id' not in st.session_state:
-        st.session_state.assessment_id = None
-    if 'assessment_step' not in st.session_state:
-        st.session_state.assessment_step = 0
-    if 'debt_details' not in st.session_state:
-        st.session_state.debt_details = {}
+    # Shallow copy so sessions never share the default {} / [] containers
+    for key, value in _SESSION_DEFAULTS.items():
+        st.session_state.setdefault(key, copy.copy(value))
 init_session_state()
 
 # -------------------------
@@ -373,55 +641,217 @@ STOCKS_DB = {
     ]
 }
 
+# Allocation keys resolved to their STOCKS_DB category, limited to categories that have stocks
+_ALLOCATION_STOCK_CATEGORIES = {
+    key: ALLOCATION_TO_DB.get(key, key)
+    for key in (*ALLOCATION_TO_DB, *STOCKS_DB)
+    if ALLOCATION_TO_DB.get(key, key) in STOCKS_DB
+}
+
+@st.cache_resource(show_spinner=False)
+def get_stocks_frame():
+    """STOCKS_DB flattened into one DataFrame (one row per stock, plus a 'category' column).
+
+    Built once per process; treat the returned frame as read-only. The repeated
+    label columns are categoricals.
+    """
+    return pd.DataFrame([
+        {**stock, "category": category}
+        for category, stocks in STOCKS_DB.items()
+        for stock in stocks
+    ]).astype({"sector": "category", "market_cap": "category", "category": "category"})
+
+@st.cache_resource(show_spinner=False)
+def get_stocks_by_category():
+    """Read-only mapping of category -> tuple of stock records, grouped once per process"""
+    return MappingProxyType({
+        category: tuple(group.drop(columns="category").to_dict('records'))
+        for category, group in get_stocks_frame().groupby("category", observed=True, sort=False)
+    })
+
 # -------------------------
 # RISK CALCULATOR
 # -------------------------
+def _fhs_core(monthly_income, monthly_expenses, emergency_score, high_interest_debt,
+              w_emergency, w_debt, w_savings, w_income_stability):
+    """Scalar arithmetic core of the Financial Health Score (plain numbers in, tuple out)"""
+    # Basic metrics
+    disposable_income = max(0.0, monthly_income - monthly_expenses)
+    annual_income = monthly_income * 12.0
+
+    # Savings Rate Score (1-5): count the bucket edges reached instead of an if/elif ladder
+    savings_rate = (disposable_income / monthly_income) if monthly_income > 0 else 0.0
+    savings_rate_score = (1 + (savings_rate >= 0.10) + (savings_rate >= 0.20) +
+                          (savings_rate >= 0.30) + (savings_rate >= 0.40))
+
+    # Debt Score (0-1)
+    debt_ratio = min(1.0, high_interest_debt / annual_income) if annual_income > 0 else 1.0
+    debt_score = max(0.0, 1.0 - debt_ratio)
+
+    # Emergency component: map 1-5 → percentage
+    emergency_component = (emergency_score / 5.0) * 100.0
+    debt_component = debt_score * 100.0
+    savings_component = (savings_rate_score / 5.0) * 100.0
+
+    # Income stability: optional - currently assumed good; can be replaced with a user input later
+    income_stability_component = 100.0
+
+    financial_health_score = (
+        w_emergency * emergency_component +
+        w_debt * debt_component +
+        w_savings * savings_component +
+        w_income_stability * income_stability_component
+    )
+    return financial_health_score, savings_rate_score, debt_score, disposable_income, debt_ratio
+
+# Risk-score weights in _risk_scores_core input order (capacity 40, tolerance 30, requirement 20 points)
+_RISK_WEIGHTS = (8.0, 6.0, 6.0, 10.0, 10.0, 15.0, 10.0, 5.0, 15.0, 5.0)
+
+def _risk_scores_core(age_score, savings_rate_score, debt_score, emergency_score, horizon_score,
+                      risk_behavior_score, experience_score, loss_capacity_normalized,
+                      purpose_score, goal_priority_normalized):
+    """Weighted sums behind the 90-point risk score (1-5 scores in, subscore tuple out)"""
+    w_age, w_savings, w_debt, w_emergency, w_horizon, w_behavior, w_experience, w_loss, w_purpose, w_goal = _RISK_WEIGHTS
+
+    # RISK CAPACITY (40 points)
+    risk_capacity = (
+        w_age * (age_score / 5.0) +
+        w_savings * (savings_rate_score / 5.0) +
+        w_debt * debt_score +
+        w_emergency * (emergency_score / 5.0) +
+        w_horizon * (horizon_score / 5.0)
+    )
+
+    # RISK TOLERANCE (30 points)
+    risk_tolerance = (
+        w_behavior * (risk_behavior_score / 5.0) +
+        w_experience * (experience_score / 5.0) +
+        w_loss * (loss_capacity_normalized / 5.0)
+    )
+
+    # RISK REQUIREMENT (20 points)
+    risk_requirement = (
+        w_purpose * (purpose_score / 5.0) +
+        w_goal * (goal_priority_normalized / 5.0)
+    )
+
+    return risk_capacity, risk_tolerance, risk_requirement
+
+# Safety-override lookup tables, indexed by 1-based score (index 0 unused)
+_AGE_BY_SCORE = (40, 60, 50, 40, 30, 22)
+_EQUITY_BY_INDEX = (60, 20, 40, 60, 80, 90)
+_RISK_CATEGORIES = (None, "VERY LOW RISK", "LOW RISK", "MEDIUM RISK", "HIGH RISK", "VERY HIGH RISK")
+_RISK_INDEX = MappingProxyType({category: index for index, category in enumerate(_RISK_CATEGORIES) if category})
+# Months of expenses already saved, per 1-5 emergency answer
+_EMERGENCY_FUND_MONTHS = MappingProxyType({1: 0, 2: 1, 3: 2, 4: 4.5, 5: 8})
+# Max share of disposable income to invest, by financial-health bucket (<50, <70, <85, 85+)
+_INVESTMENT_RATE_BY_BUCKET = (0.10, 0.20, 0.30, 0.40)
+_ALLOCATION_KEYS = ("Large_Cap", "Mid_Cap", "Small_Cap", "Growth")
+_ALLOCATION_TABLE = (
+    None,
+    (85, 15, 0, 0),
+    (70, 25, 0, 5),
+    (50, 30, 10, 10),
+    (35, 30, 15, 20),
+    (20, 25, 25, 30)
+)
+
+# Override flags returned by _overrides_core
+_OV_FINANCIAL_HEALTH = 1
+_OV_GOAL_CRITICAL = 2
+_OV_GOAL_IMPORTANT = 4
+_OV_LIQUIDITY = 8
+_OV_CONSISTENCY = 16
+_OV_AGE_EQUITY = 32
+_OV_CONCENTRATION = 64
+_OV_LOW_INCOME = 128
+
+def _overrides_core(current_index, emergency_score, high_interest_debt, monthly_income, goal_priority,
+                    liquidity_need, age_score, risk_behavior, horizon_score, experience_score, purpose_score):
+    """Numeric core of the safety-override cascade.
+
+    Returns (final_index, allocation_index, contradictions, user_age, aggressive_exposure, override_flags).
+    """
+    overrides = 0
+    contradictions = 0
+
+    # Override: Financial Health (emergency or debt)
+    if emergency_score < 3 or high_interest_debt > 0:
+        current_index = max(1, current_index - 1)
+        overrides |= _OV_FINANCIAL_HEALTH
+
+    # Override: Goal Priority
+    if goal_priority == 1:  # Critical
+        current_index = max(1, current_index - 2)
+        overrides |= _OV_GOAL_CRITICAL
+    elif goal_priority == 2:  # Important
+        current_index = max(1, current_index - 1)
+        overrides |= _OV_GOAL_IMPORTANT
+
+    # Override: Liquidity Need (High liquidity need caps at MEDIUM)
+    if liquidity_need == 1:
+        current_index = min(current_index, 3)
+        overrides |= _OV_LIQUIDITY
+
+    # Consistency contradictions
+    if risk_behavior >= 4:
+        contradictions += (emergency_score <= 2) + (horizon_score <= 2) + (experience_score <= 2)
+    if purpose_score == 5 and monthly_income < 50000:
+        contradictions += 1
+
+    if contradictions >= 2:
+        current_index = max(1, current_index - 1)
+        overrides |= _OV_CONSISTENCY
+
+    # Age-Equity check
+    user_age = _AGE_BY_SCORE[age_score] if 1 <= age_score <= 5 else 40
+    reference_equity = 100 - user_age
+    if _EQUITY_BY_INDEX[current_index] > (reference_equity + 15):
+        current_index = max(1, current_index - 1)
+        overrides |= _OV_AGE_EQUITY
+
+    # Portfolio concentration (based on index)
+    alloc_index = current_index
+    allocation = _ALLOCATION_TABLE[alloc_index]
+    aggressive_exposure = allocation[2] + allocation[3]
+    if aggressive_exposure > 45:
+        current_index = max(1, current_index - 1)
+        overrides |= _OV_CONCENTRATION
+
+    # Low income cap
+    if monthly_income < 25000:
+        current_index = min(current_index, 3)
+        overrides |= _OV_LOW_INCOME
+
+    # Final bounds
+    current_index = max(1, min(5, current_index))
+    return current_index, alloc_index, contradictions, user_age, aggressive_exposure, overrides
+
+# Confidence penalties in mask-bit order, and (score, level) for each of the 16 penalty masks
+_CONFIDENCE_PENALTIES = ("Low financial health", "Multiple overrides", "Contradictory answers", "Low investment capacity")
+
+def _confidence_level(score):
+    if score >= 80:
+        return "HIGH"
+    elif score >= 60:
+        return "MEDIUM"
+    return "LOW"
+
+_CONFIDENCE_TABLE = tuple(
+    (score, _confidence_level(score))
+    for score in (max(40, 90 - 10 * bin(mask).count("1")) for mask in range(16))
+)
+
 class RiskCalculator:
     @staticmethod
     def calculate_financial_health_score(answers):
         """Calculate Financial Health Score (0-100)"""
-        monthly_income = float(answers.get('monthly_income', 0))
-        monthly_expenses = float(answers.get('monthly_expenses', 0))
-        emergency_score = int(answers.get('emergency', 3))
-        high_interest_debt = float(answers.get('high_interest_debt', 0))
-
-        # Basic metrics
-        disposable_income = max(0.0, monthly_income - monthly_expenses)
-        annual_income = monthly_income * 12.0
-
-        # Savings Rate Score (1-5)
-        savings_rate = (disposable_income / monthly_income) if monthly_income > 0 else 0.0
-        if savings_rate < 0.10:
-            savings_rate_score = 1
-        elif savings_rate < 0.20:
-            savings_rate_score = 2
-        elif savings_rate < 0.30:
-            savings_rate_score = 3
-        elif savings_rate < 0.40:
-            savings_rate_score = 4
-        else:
-            savings_rate_score = 5
-
-        # Debt Score (0-1)
-        if annual_income > 0:
-            debt_ratio = min(1.0, high_interest_debt / annual_income)
-        else:
-            debt_ratio = 1.0
-        debt_score = max(0.0, 1.0 - debt_ratio)
-
-        # Emergency component: map 1-5 → percentage
-        emergency_component = (emergency_score / 5.0) * 100.0
-        debt_component = debt_score * 100.0
-        savings_component = (savings_rate_score / 5.0) * 100.0
-
-        # Income stability: optional - currently assumed good; can be replaced with a user input later
-        income_stability_component = 100.0
-
-        financial_health_score = (
-            WEIGHTS['emergency'] * emergency_component +
-            WEIGHTS['debt'] * debt_component +
-            WEIGHTS['savings'] * savings_component +
-            WEIGHTS['income_stability'] * income_stability_component
+        financial_health_score, savings_rate_score, debt_score, disposable_income, debt_ratio = _fhs_core(
+            float(answers.get('monthly_income', 0)),
+            float(answers.get('monthly_expenses', 0)),
+            int(answers.get('emergency', 3)),
+            float(answers.get('high_interest_debt', 0)),
+            WEIGHTS['emergency'], WEIGHTS['debt'], WEIGHTS['savings'], WEIGHTS['income_stability']
         )
 
         return {
@@ -461,26 +891,10 @@ class RiskCalculator:
         goal_priority_normalized = ((goal_priority - 1) * 2) + 1  # 1-3 → 1-5
         loss_capacity_normalized = ((loss_capacity - 1) * (4.0/3.0)) + 1  # 1-4 → 1-5
 
-        # RISK CAPACITY (40 points)
-        risk_capacity = (
-            8.0 * RiskCalculator.norm(age_score) +
-            6.0 * RiskCalculator.norm(savings_rate_score) +
-            6.0 * debt_score +
-            10.0 * RiskCalculator.norm(emergency_score) +
-            10.0 * RiskCalculator.norm(horizon_score)
-        )
-
-        # RISK TOLERANCE (30 points)
-        risk_tolerance = (
-            15.0 * RiskCalculator.norm(risk_behavior_score) +
-            10.0 * RiskCalculator.norm(experience_score) +
-            5.0 * RiskCalculator.norm(loss_capacity_normalized)
-        )
-
-        # RISK REQUIREMENT (20 points)
-        risk_requirement = (
-            15.0 * RiskCalculator.norm(purpose_score) +
-            5.0 * RiskCalculator.norm(goal_priority_normalized)
+        risk_capacity, risk_tolerance, risk_requirement = _risk_scores_core(
+            age_score, float(savings_rate_score), float(debt_score), emergency_score, horizon_score,
+            risk_behavior_score, experience_score, loss_capacity_normalized,
+            purpose_score, goal_priority_normalized
         )
 
         total_score = risk_capacity + risk_tolerance + risk_requirement
@@ -495,109 +909,47 @@ class RiskCalculator:
     @staticmethod
     def get_risk_category(total_score):
         """Determine initial risk category"""
-        if total_score <= 30:
-            return "VERY LOW RISK"
-        elif total_score <= 45:
-            return "LOW RISK"
-        elif total_score <= 60:
-            return "MEDIUM RISK"
-        elif total_score <= 75:
-            return "HIGH RISK"
-        else:
-            return "VERY HIGH RISK"
+        return _RISK_CATEGORIES[1 + (total_score > 30) + (total_score > 45) + (total_score > 60) + (total_score > 75)]
 
     @staticmethod
     def apply_safety_overrides(initial_category, answers, financial_data):
         """Apply safety overrides and return category, log, allocation, contradictions"""
-        risk_index_map = {
-            "VERY LOW RISK": 1,
-            "LOW RISK": 2,
-            "MEDIUM RISK": 3,
-            "HIGH RISK": 4,
-            "VERY HIGH RISK": 5
-        }
-        current_index = risk_index_map.get(initial_category, 3)
-        override_log = []
-        contradictions = 0
-
-        # Get inputs (with safe defaults)
-        emergency_score = int(answers.get('emergency', 3))
-        high_interest_debt = float(answers.get('high_interest_debt', 0))
-        monthly_income = float(answers.get('monthly_income', 0))
-        goal_priority = int(answers.get('goal_priority', 2))
-        liquidity_need = int(answers.get('liquidity_need', 2))
-        age_score = int(answers.get('age', 3))
-        risk_behavior = int(answers.get('risk_behavior', 3))
-        horizon_score = int(answers.get('horizon', 3))
-        experience_score = int(answers.get('experience', 3))
-        purpose_score = int(answers.get('purpose', 3))
+        current_index, alloc_index, contradictions, user_age, aggressive_exposure, overrides = _overrides_core(
+            _RISK_INDEX.get(initial_category, 3),
+            int(answers.get('emergency', 3)),
+            float(answers.get('high_interest_debt', 0)),
+            float(answers.get('monthly_income', 0)),
+            int(answers.get('goal_priority', 2)),
+            int(answers.get('liquidity_need', 2)),
+            int(answers.get('age', 3)),
+            int(answers.get('risk_behavior', 3)),
+            int(answers.get('horizon', 3)),
+            int(answers.get('experience', 3)),
+            int(answers.get('purpose', 3))
+        )
 
-        # Override: Financial Health (emergency or debt)
-        if emergency_score < 3 or high_interest_debt > 0:
-            current_index = max(1, current_index - 1)
+        # Decode the override bitmask into the human-readable log (in evaluation order)
+        override_log = []
+        if overrides & _OV_FINANCIAL_HEALTH:
             override_log.append("Financial health: Emergency fund < 3 months OR high-interest debt present")
-
-        # Override: Goal Priority
-        if goal_priority == 1:  # Critical
-            current_index = max(1, current_index - 2)
+        if overrides & _OV_GOAL_CRITICAL:
             override_log.append("Goal priority: Critical goal → Downgrade 2 levels")
-        elif goal_priority == 2:  # Important
-            current_index = max(1, current_index - 1)
+        if overrides & _OV_GOAL_IMPORTANT:
             override_log.append("Goal priority: Important goal → Downgrade 1 level")
-
-        # Override: Liquidity Need (High liquidity need caps at MEDIUM)
-        if liquidity_need == 1:
-            current_index = min(current_index, 3)
+        if overrides & _OV_LIQUIDITY:
             override_log.append("Liquidity: High need → Cap at MEDIUM RISK")
-
-        # Consistency contradictions
-        if risk_behavior >= 4 and emergency_score <= 2:
-            contradictions += 1
-        if risk_behavior >= 4 and horizon_score <= 2:
-            contradictions += 1
-        if risk_behavior >= 4 and experience_score <= 2:
-            contradictions += 1
-        if purpose_score == 5 and monthly_income < 50000:
-            contradictions += 1
-
-        if contradictions >= 2:
-            current_index = max(1, current_index - 1)
+        if overrides & _OV_CONSISTENCY:
             override_log.append(f"Consistency: {contradictions} contradictions found")
-
-        # Age-Equity check
-        age_map = {1: 60, 2: 50, 3: 40, 4: 30, 5: 22}
-        user_age = age_map.get(age_score, 40)
-        reference_equity = 100 - user_age
-        equity_map = {1: 20, 2: 40, 3: 60, 4: 80, 5: 90}
-        current_equity = equity_map.get(current_index, 60)
-        if current_equity > (reference_equity + 15):
-            current_index = max(1, current_index - 1)
+        if overrides & _OV_AGE_EQUITY:
             override_log.append(f"Age-Equity: Too aggressive for age {user_age}")
-
-        # Portfolio concentration (based on index)
-        allocation_table = {
-            1: {"Large_Cap": 85, "Mid_Cap": 15, "Small_Cap": 0, "Growth": 0},
-            2: {"Large_Cap": 70, "Mid_Cap": 25, "Small_Cap": 0, "Growth": 5},
-            3: {"Large_Cap": 50, "Mid_Cap": 30, "Small_Cap": 10, "Growth": 10},
-            4: {"Large_Cap": 35, "Mid_Cap": 30, "Small_Cap": 15, "Growth": 20},
-            5: {"Large_Cap": 20, "Mid_Cap": 25, "Small_Cap": 25, "Growth": 30}
-        }
-        allocation = allocation_table.get(current_index, allocation_table[3])
-
-        aggressive_exposure = allocation.get("Small_Cap", 0) + allocation.get("Growth", 0)
-        if aggressive_exposure > 45:
-            current_index = max(1, current_index - 1)
+        if overrides & _OV_CONCENTRATION:
             override_log.append(f"Concentration: Aggressive exposure {aggressive_exposure}% > 45%")
-
-        # Low income cap
-        if monthly_income < 25000:
-            current_index = min(current_index, 3)
+        if overrides & _OV_LOW_INCOME:
             override_log.append("Income: Monthly income < ₹25,000 → Cap at MEDIUM RISK")
 
-        # Final bounds
-        current_index = max(1, min(5, current_index))
-        reverse_map = {1: "VERY LOW RISK", 2: "LOW RISK", 3: "MEDIUM RISK", 4: "HIGH RISK", 5: "VERY HIGH RISK"}
-        final_category = reverse_map.get(current_index, "MEDIUM RISK")
+        allocation = dict(zip(_ALLOCATION_KEYS, _ALLOCATION_TABLE[alloc_index]))
+        # _overrides_core clamps the index to 1-5
+        final_category = _RISK_CATEGORIES[current_index]
 
         return final_category, override_log, allocation, contradictions
 
@@ -611,8 +963,7 @@ class RiskCalculator:
         financial_health_score = float(financial_data.get('financial_health_score', 0))
 
         # Map emergency to months
-        emergency_months_map = {1: 0, 2: 1, 3: 2, 4: 4.5, 5: 8}
-        current_ef_months = emergency_months_map.get(emergency_score, 0)
+        current_ef_months = _EMERGENCY_FUND_MONTHS.get(emergency_score, 0)
         required_ef_months = 6
         ef_gap_months = max(0.0, required_ef_months - current_ef_months)
         ef_gap_amount = ef_gap_months * monthly_expenses
@@ -622,7 +973,7 @@ class RiskCalculator:
         if ef_gap_amount > 0 and disposable_income > 0:
             build_timeline = 12
             if (ef_gap_amount / build_timeline) > (disposable_income * 0.4):
-                build_timeline = max(3, int(np.ceil(ef_gap_amount / (disposable_income * 0.4))))
+                build_timeline = max(3, math.ceil(ef_gap_amount / (disposable_income * 0.4)))
             build_timeline = min(24, build_timeline)
             monthly_ef_saving = ef_gap_amount / build_timeline
         else:
@@ -635,15 +986,10 @@ class RiskCalculator:
         else:
             monthly_debt_payment = 0.0
 
-        # Investment bracket based on financial health
-        if financial_health_score < 50:
-            max_investment_rate = 0.10
-        elif financial_health_score < 70:
-            max_investment_rate = 0.20
-        elif financial_health_score < 85:
-            max_investment_rate = 0.30
-        else:
-            max_investment_rate = 0.40
+        # Investment bracket based on financial health (bucket = number of score edges reached)
+        max_investment_rate = _INVESTMENT_RATE_BY_BUCKET[
+            (financial_health_score >= 50) + (financial_health_score >= 70) + (financial_health_score >= 85)
+        ]
 
         available_after_priorities = max(0.0, disposable_income - monthly_ef_saving - monthly_debt_payment)
         investment_limit = disposable_income * max_investment_rate
@@ -665,118 +1011,130 @@ class RiskCalculator:
     @staticmethod
     def calculate_confidence_score(financial_health_score, override_log, safe_investment, contradictions):
         """Calculate confidence score 40-90 (normalized to 0-100 for display consistency)"""
-        penalties = []
-        if financial_health_score < 50:
-            penalties.append("Low financial health")
-        if len(override_log) >= 3:
-            penalties.append("Multiple overrides")
-        if contradictions >= 2:
-            penalties.append("Contradictory answers")
-        if safe_investment < LOW_INVESTMENT_CONFIDENCE_THRESH:
-            penalties.append("Low investment capacity")
-
-        base_confidence = 90
-        penalty_per_item = 10
-        confidence_score = max(40, base_confidence - (len(penalties) * penalty_per_item))
-
-        # Normalize to 0-100 for UI (scale up so 90->90, floor 40->40)
-        normalized_score = confidence_score
-
-        if normalized_score >= 80:
-            level = "HIGH"
-        elif normalized_score >= 60:
-            level = "MEDIUM"
-        else:
-            level = "LOW"
+        # Base 90, minus 10 per penalty, floored at 40 (already on the 0-100 display scale)
+        mask = ((financial_health_score < 50) |
+                ((len(override_log) >= 3) << 1) |
+                ((contradictions >= 2) << 2) |
+                ((safe_investment < LOW_INVESTMENT_CONFIDENCE_THRESH) << 3))
+        score, level = _CONFIDENCE_TABLE[mask]
+        penalties = [penalty for bit, penalty in enumerate(_CONFIDENCE_PENALTIES) if mask >> bit & 1]
 
-        return {'score': int(normalized_score), 'level': level, 'penalties': penalties}
+        return {'score': score, 'level': level, 'penalties': penalties}
+
+# -------------------------
+# CACHED CALCULATIONS
+# -------------------------
+# The whole scoring pipeline is a pure function of the answers, so it is memoized on a
+# hashable (sorted items) form of them; resubmitting unchanged answers returns the
+# cached results instead of re-running every calculator.
+@st.cache_data(show_spinner=False, max_entries=128)
+def _compute_all(answers_items):
+    """Run every RiskCalculator step for one set of answers.
+
+    Returns (financial_data, risk_scores, final_category, override_log, allocation,
+    contradictions, investment_data, confidence_data).
+    """
+    answers = dict(answers_items)
+
+    financial_data = RiskCalculator.calculate_financial_health_score(answers)
+    risk_scores = RiskCalculator.calculate_risk_scores(answers, financial_data)
+
+    initial_category = RiskCalculator.get_risk_category(risk_scores['total_score'])
+    final_category, override_log, allocation, contradictions = RiskCalculator.apply_safety_overrides(
+        initial_category, answers, financial_data
+    )
+
+    investment_data = RiskCalculator.calculate_safe_investment(answers, financial_data)
+    confidence_data = RiskCalculator.calculate_confidence_score(
+        financial_data['financial_health_score'],
+        override_log,
+        investment_data['safe_monthly_investment'],
+        contradictions
+    )
+
+    return (financial_data, risk_scores, final_category, override_log, allocation,
+            contradictions, investment_data, confidence_data)
 
 # -------------------------
 # HELPER FUNCTIONS
 # -------------------------
+# Button callbacks: they run before the script reruns, so the click's own rerun
+# already renders the new state and no follow-up st.rerun() is needed
+def _go_to_tab(tab):
+    st.session_state.current_tab = tab
+
+def _start_new_assessment():
+    st.session_state.clear()
+    init_session_state()
+
 def create_navigation_buttons():
     """Create Next/Previous buttons for navigation"""
-    tabs = ["Welcome", "Assessment", "Financial Health", "Risk Profile", "Recommendations", "Action Plan", "Data & Export"]
     current_tab = st.session_state.current_tab
-    current_index = tabs.index(current_tab) if current_tab in tabs else 0
+    current_index = TAB_INDEX.get(current_tab, 0)
     
     col1, col2, col3 = st.columns([1, 2, 1])
     
     with col1:
         # Previous button
         if current_index > 0 and current_tab != "Welcome":
-            prev_tab = tabs[current_index - 1]
-            if st.button("◀️ Previous", use_container_width=True):
-                st.session_state.current_tab = prev_tab
-                st.rerun()
+            prev_tab = TABS[current_index - 1]
+            st.button("◀️ Previous", use_container_width=True, on_click=_go_to_tab, args=(prev_tab,))
     
     with col3:
         # Next button
-        if current_index < len(tabs) - 1 and current_tab != "Data & Export":
+        if current_index < N_TABS - 1 and current_tab != "Data & Export":
             if current_tab == "Assessment" and not st.session_state.assessment_complete:
                 if st.button("Calculate Results ▶️", type="primary", use_container_width=True):
                     calculate_results()
             else:
-                next_tab = tabs[current_index + 1]
-                if st.button("Next ▶️", type="primary", use_container_width=True):
-                    st.session_state.current_tab = next_tab
-                    st.rerun()
+                next_tab = TABS[current_index + 1]
+                st.button("Next ▶️", type="primary", use_container_width=True, on_click=_go_to_tab, args=(next_tab,))
 
-def create_progress_bar():
-    """Create progress bar at top of page"""
-    tabs = ["Welcome", "Assessment", "Financial Health", "Risk Profile", "Recommendations", "Action Plan", "Data & Export"]
-    current_tab = st.session_state.current_tab
-    current_index = tabs.index(current_tab) if current_tab in tabs else 0
-    
-    progress_html = f"""
+def _progress_bar_html(current_index):
+    """Progress-bar markup with page `current_index` highlighted"""
+    return f"""
     <div style="margin-bottom: 1.5rem;">
         <div style="display: flex; justify-content: space-between; margin-bottom: 0.5rem; font-size: 0.9rem;">
-            {"".join([f'<span style="font-weight: {"bold" if i == current_index else "normal"}; color: {"#3B82F6" if i == current_index else "#6B7280"};">{tab}</span>' for i, tab in enumerate(tabs)])}
+            {"".join([f'<span style="font-weight: {"bold" if i == current_index else "normal"}; color: {"#3B82F6" if i == current_index else "#6B7280"};">{tab}</span>' for i, tab in enumerate(TABS)])}
         </div>
         <div class="progress-bar">
-            <div class="progress-fill" style="width: {(current_index + 1)/len(tabs)*100}%; background-color: #3B82F6;"></div>
+            <div class="progress-fill" style="width: {(current_index + 1)/N_TABS*100}%; background-color: #3B82F6;"></div>
         </div>
     </div>
     """
-    st.markdown(progress_html, unsafe_allow_html=True)
+
+# One rendered progress bar per page, built once at import
+_PROGRESS_HTML = tuple(_progress_bar_html(index) for index in range(N_TABS))
+
+def create_progress_bar():
+    """Create progress bar at top of page"""
+    st.markdown(_PROGRESS_HTML[TAB_INDEX.get(st.session_state.current_tab, 0)], unsafe_allow_html=True)
 
 def calculate_results():
     """Calculate all results from assessment"""
-    calculator = RiskCalculator()
-    
-    # Financial Health Score
-    financial_data = calculator.calculate_financial_health_score(st.session_state.answers)
-    st.session_state.financial_health_score = financial_data
+    answers_key = tuple(sorted(st.session_state.answers.items()))
+    pending = st.session_state.pending_save
+    if st.session_state.assessment_complete and answers_key in (
+            st.session_state.answers_key, pending and pending[0]):
+        # Unchanged resubmission whose row is saved or still being written: the stored
+        # results are current. After a failed save the row is queued again below.
+        st.session_state.next_tab = "Financial Health"
+        st.rerun()
 
-    # Risk Scores
-    risk_scores = calculator.calculate_risk_scores(st.session_state.answers, financial_data)
-    st.session_state.risk_scores = risk_scores
+    (financial_data, risk_scores, final_category, override_log, allocation,
+     contradictions, investment_data, confidence_data) = _compute_all(answers_key)
 
-    # Risk Category with overrides
-    initial_category = calculator.get_risk_category(risk_scores['total_score'])
-    final_category, override_log, allocation, contradictions = calculator.apply_safety_overrides(
-        initial_category, st.session_state.answers, financial_data
-    )
+    st.session_state.financial_health_score = financial_data
+    st.session_state.risk_scores = risk_scores
     st.session_state.risk_category = final_category
     st.session_state.override_log = override_log
     st.session_state.allocation = allocation
     st.session_state.contradictions = contradictions
-
-    # Investment Data
-    investment_data = calculator.calculate_safe_investment(st.session_state.answers, financial_data)
     st.session_state.safe_investment = investment_data
-
-    # Confidence Score
-    confidence_data = calculator.calculate_confidence_score(
-        financial_data['financial_health_score'],
-        override_log,
-        investment_data['safe_monthly_investment'],
-        contradictions
-    )
     st.session_state.confidence_score = confidence_data
 
     st.session_state.assessment_complete = True
-    st.session_state.assessment_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+    st.session_state.assessment_id = format_assessment_id(datetime.now())
     
     # Save to CSV
     assessment_data = {
@@ -791,13 +1149,32 @@ def calculate_results():
         'confidence_score': confidence_data
     }
     
-    if CSVDataHandler.save_assessment_to_csv(assessment_data):
-        st.success("✅ Assessment saved successfully!")
+    # Written in the background; the next run reports how it went
+    st.session_state.pending_save = (answers_key, CSVDataHandler.save_assessment_to_csv(assessment_data))
     
-    # Navigate to next tab
-    st.session_state.current_tab = "Financial Health"
+    # Navigate to next tab (the radio owning current_tab is already drawn this run)
+    st.session_state.next_tab = "Financial Health"
     st.rerun()
 
+def report_pending_save():
+    """Report how the background save from this session's last submission went"""
+    if st.session_state.pending_save is None:
+        return
+    answers_key, future = st.session_state.pending_save
+    # Waits on this session's own write only, not on other sessions' queued saves, and
+    # never unboundedly: a save still queued after the timeout is reported on a later run
+    try:
+        error = future.exception(timeout=SAVE_REPORT_TIMEOUT)
+    except FutureTimeoutError:
+        return
+    st.session_state.pending_save = None
+    if error is None:
+        # Only a saved row lets an unchanged resubmission skip the save
+        st.session_state.answers_key = answers_key
+        st.toast("Assessment saved", icon="✅")
+    else:
+        st.error(f"Error saving to CSV: {str(error)}")
+
 # -------------------------
 # Welcome Tab
 # -------------------------
@@ -836,9 +1213,8 @@ def create_welcome_tab():
     
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        if st.button("▶️ Begin Assessment", type="primary", use_container_width=True):
-            st.session_state.current_tab = "Assessment"
-            st.rerun()
+        st.button("▶️ Begin Assessment", type="primary", use_container_width=True,
+                  on_click=_go_to_tab, args=("Assessment",))
     
     st.markdown("---")
     st.markdown("""
@@ -863,6 +1239,91 @@ def create_welcome_tab():
 # -------------------------
 # Assessment Tab (UPDATED)
 # -------------------------
+# Assessment form defaults used until the user has submitted answers
+_ANSWER_DEFAULTS = {
+    'monthly_income': 50000.0,
+    'monthly_expenses': 30000.0,
+    'emergency': 3,
+    'age': 3,
+    'high_interest_debt': 0.0,
+    'purpose': 4,
+    'horizon': 3,
+    'experience': 2,
+    'goal_priority': 2,
+    'risk_behavior': 3,
+    'loss_capacity': 2,
+    'liquidity_need': 2
+}
+
+# Widget option labels, indexed by the 1-based option value (index 0 unused)
+_EMERGENCY_LABELS = (
+    None,
+    "❌ No emergency fund",
+    "⚠️ 1 month of expenses saved",
+    "🟡 1-3 months of expenses saved",
+    "🟢 3-6 months of expenses saved",
+    "✅ 6+ months of expenses saved"
+)
+_AGE_LABELS = (
+    None,
+    "56-65+ years",
+    "46-55 years",
+    "36-45 years",
+    "25-35 years",
+    "Under 25 years"
+)
+_PURPOSE_LABELS = (
+    None,
+    "💰 Capital preservation",
+    "📈 Regular income generation",
+    "🎓 Education/Tax saving",
+    "🏠 Retirement planning",
+    "🚀 Wealth creation/Growth"
+)
+_HORIZON_LABELS = (
+    None,
+    "Less than 2 years",
+    "2-4 years",
+    "5-7 years",
+    "8-12 years",
+    "13+ years"
+)
+_EXPERIENCE_LABELS = (
+    None,
+    "👶 No experience (first time investor)",
+    "👶 Beginner (FDs, basic mutual funds)",
+    "👤 Intermediate (stocks, some diversification)",
+    "👨‍💼 Advanced (multiple asset classes)",
+    "👨‍🎓 Expert (professional/sophisticated)"
+)
+_GOAL_PRIORITY_LABELS = (
+    None,
+    "🔴 Critical (health/education - cannot fail)",
+    "🟡 Important (wedding/house - should not fail)",
+    "🟢 Flexible (wealth building - can adjust)"
+)
+_RISK_BEHAVIOR_LABELS = (
+    None,
+    "🚨 Panic & Sell",
+    "😟 Worry but Hold",
+    "😐 Stay Calm",
+    "😊 See Opportunity",
+    "🚀 Buy More!"
+)
+_LOSS_CAPACITY_LABELS = (
+    None,
+    "0-10% (Conservative)",
+    "11-20% (Moderate)",
+    "21-30% (Aggressive)",
+    "31%+ (Very Aggressive)"
+)
+_LIQUIDITY_NEED_LABELS = (
+    None,
+    "⚠️ High (may need within 1 year)",
+    "🟡 Medium (2-3 years)",
+    "🟢 Low (>3 years)"
+)
+
 def create_assessment_tab():
     st.markdown('<h1 class="main-header">📋 Stock Investment Readiness Assessment</h1>', unsafe_allow_html=True)
     
@@ -872,8 +1333,14 @@ def create_assessment_tab():
     </div>
     """, unsafe_allow_html=True)
     
+    answers = st.session_state.answers
+    
     # Progress indicator
-    answered = len([k for k in st.session_state.answers.keys() if st.session_state.answers[k] not in [None, '']])
+    # Widget defaults: the last submitted answer, falling back to _ANSWER_DEFAULTS
+    current = {**_ANSWER_DEFAULTS, **answers}
+    
+    # answers is only ever filled on submit, with numeric values for all 12 questions
+    answered = len(answers)
     progress_pct = min(100, int((answered / 12) * 100)) if answered > 0 else 0
     st.markdown(f"""
     <div style="margin: 1rem 0;">
@@ -894,13 +1361,13 @@ def create_assessment_tab():
         with col1:
             monthly_income = st.number_input(
                 "1. What is your monthly take-home income? (₹)",
-                min_value=0.0, max_value=10_000_000.0, value=float(st.session_state.answers.get('monthly_income', 50000.0)),
+                min_value=0.0, max_value=10_000_000.0, value=current['monthly_income'],
                 step=500.0, 
                 help="Your monthly income after taxes and deductions"
             )
             monthly_expenses = st.number_input(
                 "2. What are your monthly essential expenses? (₹)",
-                min_value=0.0, max_value=10_000_000.0, value=float(st.session_state.answers.get('monthly_expenses', 30000.0)),
+                min_value=0.0, max_value=10_000_000.0, value=current['monthly_expenses'],
                 step=500.0,
                 help="Rent, food, bills, insurance, minimum debt payments"
             )
@@ -909,28 +1376,16 @@ def create_assessment_tab():
             emergency = st.selectbox(
                 "3. Emergency fund status?",
                 options=[1, 2, 3, 4, 5],
-                format_func=lambda x: {
-                    1: "❌ No emergency fund",
-                    2: "⚠️ 1 month of expenses saved",
-                    3: "🟡 1-3 months of expenses saved",
-                    4: "🟢 3-6 months of expenses saved",
-                    5: "✅ 6+ months of expenses saved"
-                }[x],
-                index=int(st.session_state.answers.get('emergency', 3)) - 1,
+                format_func=_EMERGENCY_LABELS.__getitem__,
+                index=current['emergency'] - 1,
                 help="Recommended: 3-6 months of expenses"
             )
             
             age = st.selectbox(
                 "4. What is your age group?",
                 options=[1, 2, 3, 4, 5],
-                format_func=lambda x: {
-                    1: "56-65+ years",
-                    2: "46-55 years",
-                    3: "36-45 years",
-                    4: "25-35 years",
-                    5: "Under 25 years"
-                }[x],
-                index=int(st.session_state.answers.get('age', 3)) - 1
+                format_func=_AGE_LABELS.__getitem__,
+                index=current['age'] - 1
             )
         
         st.markdown("---")
@@ -945,7 +1400,7 @@ def create_assessment_tab():
         high_interest_debt = st.number_input(
             "5. Total high-interest debt amount (₹)",
             min_value=0.0, max_value=100_000_000.0, 
-            value=float(st.session_state.answers.get('high_interest_debt', 0.0)),
+            value=current['high_interest_debt'],
             step=1000.0,
             help="Credit cards, personal loans >12% interest"
         )
@@ -968,52 +1423,30 @@ def create_assessment_tab():
             purpose = st.selectbox(
                 "6. Primary investment purpose?",
                 options=[1, 2, 3, 4, 5],
-                format_func=lambda x: {
-                    1: "💰 Capital preservation",
-                    2: "📈 Regular income generation",
-                    3: "🎓 Education/Tax saving",
-                    4: "🏠 Retirement planning",
-                    5: "🚀 Wealth creation/Growth"
-                }[x],
-                index=int(st.session_state.answers.get('purpose', 4)) - 1
+                format_func=_PURPOSE_LABELS.__getitem__,
+                index=current['purpose'] - 1
             )
             
             horizon = st.selectbox(
                 "7. Investment time horizon?",
                 options=[1, 2, 3, 4, 5],
-                format_func=lambda x: {
-                    1: "Less than 2 years",
-                    2: "2-4 years",
-                    3: "5-7 years",
-                    4: "8-12 years",
-                    5: "13+ years"
-                }[x],
-                index=int(st.session_state.answers.get('horizon', 3)) - 1
+                format_func=_HORIZON_LABELS.__getitem__,
+                index=current['horizon'] - 1
             )
         
         with col2:
             experience = st.selectbox(
                 "8. Investment experience level?",
                 options=[1, 2, 3, 4, 5],
-                format_func=lambda x: {
-                    1: "👶 No experience (first time investor)",
-                    2: "👶 Beginner (FDs, basic mutual funds)",
-                    3: "👤 Intermediate (stocks, some diversification)",
-                    4: "👨‍💼 Advanced (multiple asset classes)",
-                    5: "👨‍🎓 Expert (professional/sophisticated)"
-                }[x],
-                index=int(st.session_state.answers.get('experience', 2)) - 1
+                format_func=_EXPERIENCE_LABELS.__getitem__,
+                index=current['experience'] - 1
             )
             
             goal_priority = st.selectbox(
                 "9. How critical is your investment goal?",
                 options=[1, 2, 3],
-                format_func=lambda x: {
-                    1: "🔴 Critical (health/education - cannot fail)",
-                    2: "🟡 Important (wedding/house - should not fail)",
-                    3: "🟢 Flexible (wealth building - can adjust)"
-                }[x],
-                index=int(st.session_state.answers.get('goal_priority', 2)) - 1
+                format_func=_GOAL_PRIORITY_LABELS.__getitem__,
+                index=current['goal_priority'] - 1
             )
         
         st.markdown("---")
@@ -1039,14 +1472,8 @@ def create_assessment_tab():
             risk_behavior = st.select_slider(
                 "If your stocks dropped 20% tomorrow, you would:",
                 options=[1, 2, 3, 4, 5],
-                value=int(st.session_state.answers.get('risk_behavior', 3)),
-                format_func=lambda x: {
-                    1: "🚨 Panic & Sell",
-                    2: "😟 Worry but Hold",
-                    3: "😐 Stay Calm",
-                    4: "😊 See Opportunity",
-                    5: "🚀 Buy More!"
-                }[x]
+                value=current['risk_behavior'],
+                format_func=_RISK_BEHAVIOR_LABELS.__getitem__
             )
         
         with col2:
@@ -1054,24 +1481,15 @@ def create_assessment_tab():
             loss_capacity = st.select_slider(
                 "Maximum % you could afford to lose in a bad year:",
                 options=[1, 2, 3, 4],
-                value=int(st.session_state.answers.get('loss_capacity', 2)),
-                format_func=lambda x: {
-                    1: "0-10% (Conservative)",
-                    2: "11-20% (Moderate)",
-                    3: "21-30% (Aggressive)",
-                    4: "31%+ (Very Aggressive)"
-                }[x]
+                value=current['loss_capacity'],
+                format_func=_LOSS_CAPACITY_LABELS.__getitem__
             )
         
         liquidity_need = st.selectbox(
             "12. Do you expect to need this money suddenly?",
             options=[1, 2, 3],
-            format_func=lambda x: {
-                1: "⚠️ High (may need within 1 year)",
-                2: "🟡 Medium (2-3 years)",
-                3: "🟢 Low (>3 years)"
-            }[x],
-            index=int(st.session_state.answers.get('liquidity_need', 2)) - 1,
+            format_func=_LIQUIDITY_NEED_LABELS.__getitem__,
+            index=current['liquidity_need'] - 1,
             help="Affects liquidity of recommended investments"
         )
         
@@ -1092,20 +1510,20 @@ def create_assessment_tab():
                 st.warning("⚠️ Your expenses exceed your income. Please review your inputs.")
                 return
             
-            # Save answers
-            st.session_state.answers.update({
-                'monthly_income': float(monthly_income),
-                'monthly_expenses': float(monthly_expenses),
-                'emergency': int(emergency),
-                'high_interest_debt': float(high_interest_debt),
-                'age': int(age),
-                'purpose': int(purpose),
-                'horizon': int(horizon),
-                'risk_behavior': int(risk_behavior),
-                'experience': int(experience),
-                'goal_priority': int(goal_priority),
-                'loss_capacity': int(loss_capacity),
-                'liquidity_need': int(liquidity_need)
+            # Save answers (number_input already returns floats and the selectors their int options)
+            answers.update({
+                'monthly_income': monthly_income,
+                'monthly_expenses': monthly_expenses,
+                'emergency': emergency,
+                'high_interest_debt': high_interest_debt,
+                'age': age,
+                'purpose': purpose,
+                'horizon': horizon,
+                'risk_behavior': risk_behavior,
+                'experience': experience,
+                'goal_priority': goal_priority,
+                'loss_capacity': loss_capacity,
+                'liquidity_need': liquidity_need
             })
             
             # Calculate results and navigate
@@ -1122,75 +1540,72 @@ def create_assessment_tab():
 # -------------------------
 # Financial Health Tab (UPDATED with navigation)
 # -------------------------
-def create_financial_health_tab():
-    st.markdown('<h1 class="main-header">💰 Financial Health Assessment</h1>', unsafe_allow_html=True)
-    
-    if not st.session_state.assessment_complete or st.session_state.financial_health_score is None:
-        st.warning("Please complete the assessment first!")
-        st.button("Go to Assessment", on_click=lambda: setattr(st.session_state, 'current_tab', 'Assessment'))
-        return
-    
-    financial_data = st.session_state.financial_health_score
-    
+# Headline metric card and accent-bordered stat card, shared by the Financial Health
+# and Recommendations tabs
+_METRIC_CARD_TMPL = """
+<div class="metric-card">
+    <h3 style="margin: 0; font-size: 1.1rem;">{title}</h3>
+    <h1 style="margin: 0.35rem 0; font-size: {size}; color: {color};">{value}</h1>
+    <p style="margin: 0;">{subtitle}</p>
+</div>
+"""
+_STAT_CARD_TMPL = """
+<div class="card" style="border-left-color: {color};">
+    <h4 style="margin: 0;">{title}</h4>
+    <h2 style="margin: 0.4rem 0; color: {color};">{value}</h2>
+    <p style="margin: 0; color: #6B7280; font-size: 0.9rem;">{subtitle}</p>
+</div>
+"""
+# Header card colour and label per band (0 = red, 1 = amber, 2 = green)
+_BAND_COLORS = ("#EF4444", "#F59E0B", "#10B981")
+_HEALTH_BAND_LABELS = ('🔴 Critical', '🟡 Needs Work', '🟢 Strong')
+_DEBT_BAND_LABELS = ('🔴 High', '🟡 Moderate', '🟢 Low')
+_SAVINGS_BAND_LABELS = ('🔴 Low', '🟡 Okay', '🟢 Good')
+# Short emergency-fund status per 1-5 answer
+_EMERGENCY_STATUS_LABELS = ("No fund", "1 month", "1-3 months", "3-6 months", "6+ months")
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _financial_health_cards(answers_items, financial_items, investment_items):
+    """HTML for each Financial Health tab card, keyed by card name ('' when the card is not shown)"""
+    answers = dict(answers_items)
+    financial_data = dict(financial_items)
+    investment_data = dict(investment_items)
+    cards = {}
+
     # Header metrics
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        score = financial_data['financial_health_score']
-        color = "#10B981" if score >= 70 else "#F59E0B" if score >= 50 else "#EF4444"
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3 style="margin: 0; font-size: 1.1rem;">Financial Health Score</h3>
-            <h1 style="margin: 0.35rem 0; font-size: 2.5rem; color: {color};">{score}/100</h1>
-            <p style="margin: 0;">{'🟢 Strong' if score >= 70 else '🟡 Needs Work' if score >= 50 else '🔴 Critical'}</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        disposable = financial_data['disposable_income']
-        st.markdown(f"""
-        <div class="card" style="border-left-color: #3B82F6;">
-            <h4 style="margin: 0;">Monthly Disposable Income</h4>
-            <h2 style="margin: 0.4rem 0; color: #3B82F6;">₹{disposable:,.0f}</h2>
-            <p style="margin: 0; color: #6B7280; font-size: 0.9rem;">Income - Expenses</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        debt_ratio = financial_data['debt_ratio']
-        debt_color = "#10B981" if debt_ratio <= 0.1 else "#F59E0B" if debt_ratio <= 0.3 else "#EF4444"
-        st.markdown(f"""
-        <div class="card" style="border-left-color: {debt_color};">
-            <h4 style="margin: 0;">Debt to Income Ratio</h4>
-            <h2 style="margin: 0.4rem 0; color: {debt_color};">{debt_ratio:.1%}</h2>
-            <p style="margin: 0; color: #6B7280; font-size: 0.9rem;">{'🟢 Low' if debt_ratio <= 0.1 else '🟡 Moderate' if debt_ratio <= 0.3 else '🔴 High'}</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        savings_score = financial_data['savings_rate_score']
-        savings_rate = (financial_data['disposable_income'] / st.session_state.answers.get('monthly_income', 1)) * 100
-        savings_color = "#10B981" if savings_rate >= 20 else "#F59E0B" if savings_rate >= 10 else "#EF4444"
-        st.markdown(f"""
-        <div class="card" style="border-left-color: {savings_color};">
-            <h4 style="margin: 0;">Savings Rate</h4>
-            <h2 style="margin: 0.4rem 0; color: {savings_color};">{savings_rate:.1f}%</h2>
-            <p style="margin: 0; color: #6B7280; font-size: 0.9rem;">{'🟢 Good' if savings_rate >= 20 else '🟡 Okay' if savings_rate >= 10 else '🔴 Low'}</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # Detailed Breakdown
-    st.markdown('<h3 class="section-header">📊 Financial Health Breakdown</h3>', unsafe_allow_html=True)
-    
-    col1, col2 = st.columns(2)
-    with col1:
-        # Emergency Fund Status
-        emergency_score = int(st.session_state.answers.get('emergency', 3))
-        emergency_labels = ["No fund", "1 month", "1-3 months", "3-6 months", "6+ months"]
-        emergency_status = emergency_labels[emergency_score - 1]
-        
-        st.markdown("<div class='card'><h4 style='margin:0 0 1rem 0;'>🛡️ Emergency Fund Status</h4>", unsafe_allow_html=True)
-        progress = emergency_score / 5.0
-        st.markdown(f"""
+    score = financial_data['financial_health_score']
+    band = (score >= 50) + (score >= 70)
+    cards['score'] = _METRIC_CARD_TMPL.format(
+        title="Financial Health Score", size="2.5rem", color=_BAND_COLORS[band], value=f"{score}/100",
+        subtitle=_HEALTH_BAND_LABELS[band]
+    )
+
+    disposable = financial_data['disposable_income']
+    cards['disposable'] = _STAT_CARD_TMPL.format(
+        title="Monthly Disposable Income", color="#3B82F6", value=f"₹{disposable:,.0f}",
+        subtitle="Income - Expenses"
+    )
+
+    debt_ratio = financial_data['debt_ratio']
+    band = (debt_ratio <= 0.3) + (debt_ratio <= 0.1)
+    cards['debt_ratio'] = _STAT_CARD_TMPL.format(
+        title="Debt to Income Ratio", color=_BAND_COLORS[band], value=f"{debt_ratio:.1%}",
+        subtitle=_DEBT_BAND_LABELS[band]
+    )
+
+    savings_rate = (financial_data['disposable_income'] / answers.get('monthly_income', 1)) * 100
+    band = (savings_rate >= 10) + (savings_rate >= 20)
+    cards['savings_rate'] = _STAT_CARD_TMPL.format(
+        title="Savings Rate", color=_BAND_COLORS[band], value=f"{savings_rate:.1f}%",
+        subtitle=_SAVINGS_BAND_LABELS[band]
+    )
+
+    # Emergency Fund Status
+    emergency_score = int(answers.get('emergency', 3))
+    emergency_status = _EMERGENCY_STATUS_LABELS[emergency_score - 1]
+    progress = emergency_score / 5.0
+    cards['emergency'] = f"""
+        <div class='card'><h4 style='margin:0 0 1rem 0;'>🛡️ Emergency Fund Status</h4>
         <div class="progress-bar">
             <div class="progress-fill" style="width: {progress*100}%; background-color: #3B82F6;"></div>
         </div>
@@ -1200,14 +1615,15 @@ def create_financial_health_tab():
              '⚠️ Consider building to 3-6 months' if emergency_score >= 2 else 
              '🚨 Build emergency fund first'}
         </p>
-        """, unsafe_allow_html=True)
-        st.markdown("</div>", unsafe_allow_html=True)
-        
-        # Debt Analysis
-        high_interest_debt = st.session_state.answers.get('high_interest_debt', 0)
-        if high_interest_debt > 0:
-            st.markdown("<div class='card' style='border-left-color: #EF4444;'><h4 style='margin:0 0 1rem 0;'>💳 High-Interest Debt</h4>", unsafe_allow_html=True)
-            st.markdown(f"""
+        </div>
+        """
+
+    # Debt Analysis
+    high_interest_debt = answers.get('high_interest_debt', 0)
+    cards['debt'] = ""
+    if high_interest_debt > 0:
+        cards['debt'] = f"""
+            <div class='card' style='border-left-color: #EF4444;'><h4 style='margin:0 0 1rem 0;'>💳 High-Interest Debt</h4>
             <p style="margin: 0; font-weight: 600; color: #EF4444;">₹{high_interest_debt:,.0f}</p>
             <p style="margin: 0.5rem 0; color: #6B7280; font-size: 0.9rem;">
             Minimum monthly payment: ₹{high_interest_debt * 0.03:,.0f}
@@ -1216,22 +1632,17 @@ def create_financial_health_tab():
             {'🚨 Priority: Pay this before aggressive investing' if debt_ratio > 0.3 else 
              '⚠️ Consider paying down before increasing investments'}
             </p>
-            """, unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
-    
-    with col2:
-        # Income vs Expenses
-        income = st.session_state.answers.get('monthly_income', 0)
-        expenses = st.session_state.answers.get('monthly_expenses', 0)
-        
-        st.markdown("<div class='card'><h4 style='margin:0 0 1rem 0;'>📈 Income vs Expenses</h4>", unsafe_allow_html=True)
-        
-        # Create a simple bar chart using HTML
-        max_val = max(income, expenses)
-        income_width = (income / max_val) * 100 if max_val > 0 else 0
-        expenses_width = (expenses / max_val) * 100 if max_val > 0 else 0
-        
-        st.markdown(f"""
+            </div>
+            """
+
+    # Income vs Expenses, as a simple HTML bar chart
+    income = answers.get('monthly_income', 0)
+    expenses = answers.get('monthly_expenses', 0)
+    max_val = max(income, expenses)
+    income_width = (income / max_val) * 100 if max_val > 0 else 0
+    expenses_width = (expenses / max_val) * 100 if max_val > 0 else 0
+    cards['income_expenses'] = f"""
+        <div class='card'><h4 style='margin:0 0 1rem 0;'>📈 Income vs Expenses</h4>
         <div style="margin-bottom: 1rem;">
             <div style="display: flex; justify-content: space-between; margin-bottom: 0.25rem;">
                 <span>Income</span>
@@ -1258,22 +1669,16 @@ def create_financial_health_tab():
                 <span style="font-weight: 600; color: #3B82F6;">₹{income-expenses:,.0f}</span>
             </div>
         </div>
-        """, unsafe_allow_html=True)
-        st.markdown("</div>", unsafe_allow_html=True)
-    
-    # Priority Actions
-    st.markdown('<h3 class="section-header">🎯 Priority Actions</h3>', unsafe_allow_html=True)
-    
-    investment_data = st.session_state.safe_investment or {}
+        </div>
+        """
+
+    # Priority action cards (only shown once investment recommendations exist)
+    cards['ef_action'] = cards['debt_action'] = cards['invest_action'] = ""
     if not investment_data:
-        st.warning("Investment recommendations not ready.")
-    else:
-        # Create action cards
-        col1, col2, col3 = st.columns(3)
-        
-        with col1:
-            if investment_data.get('ef_gap_amount', 0) > 0:
-                st.markdown(f"""
+        return cards
+
+    if investment_data.get('ef_gap_amount', 0) > 0:
+        cards['ef_action'] = f"""
                 <div class="card" style="border-left-color: #EF4444;">
                     <h4 style="margin:0 0 0.5rem 0; color: #EF4444;">🔴 Build Emergency Fund</h4>
                     <p style="margin: 0 0 0.5rem 0; font-weight: 600;">₹{investment_data['ef_gap_amount']:,.0f} needed</p>
@@ -1284,14 +1689,13 @@ def create_financial_health_tab():
                     Target: 6 months of expenses
                     </p>
                 </div>
-                """, unsafe_allow_html=True)
-        
-        with col2:
-            if st.session_state.answers.get('high_interest_debt', 0) > 0:
-                st.markdown(f"""
+                """
+
+    if high_interest_debt > 0:
+        cards['debt_action'] = f"""
                 <div class="card" style="border-left-color: #F59E0B;">
                     <h4 style="margin:0 0 0.5rem 0; color: #F59E0B;">🟡 Pay High-Interest Debt</h4>
-                    <p style="margin: 0 0 0.5rem 0; font-weight: 600;">₹{st.session_state.answers.get('high_interest_debt', 0):,.0f} total</p>
+                    <p style="margin: 0 0 0.5rem 0; font-weight: 600;">₹{high_interest_debt:,.0f} total</p>
                     <p style="margin: 0; color: #6B7280; font-size: 0.9rem;">
                     Minimum payment: ₹{investment_data['monthly_debt_payment']:,.0f}/month
                     </p>
@@ -1299,11 +1703,10 @@ def create_financial_health_tab():
                     Priority before aggressive investing
                     </p>
                 </div>
-                """, unsafe_allow_html=True)
-        
-        with col3:
-            if investment_data.get('safe_monthly_investment', 0) > 0:
-                st.markdown(f"""
+                """
+
+    if investment_data.get('safe_monthly_investment', 0) > 0:
+        cards['invest_action'] = f"""
                 <div class="card" style="border-left-color: #10B981;">
                     <h4 style="margin:0 0 0.5rem 0; color: #10B981;">🟢 Start Investing</h4>
                     <p style="margin: 0 0 0.5rem 0; font-weight: 600;">₹{investment_data['safe_monthly_investment']:,.0f}/month</p>
@@ -1314,9 +1717,9 @@ def create_financial_health_tab():
                     {investment_data['investment_tier']:.0f}% of disposable income
                     </p>
                 </div>
-                """, unsafe_allow_html=True)
-            else:
-                st.markdown(f"""
+                """
+    else:
+        cards['invest_action'] = f"""
                 <div class="card" style="border-left-color: #F59E0B;">
                     <h4 style="margin:0 0 0.5rem 0; color: #F59E0B;">🟡 Increase Savings</h4>
                     <p style="margin: 0; color: #6B7280; font-size: 0.9rem;">
@@ -1326,79 +1729,117 @@ def create_financial_health_tab():
                     Focus on reducing expenses or increasing income first
                     </p>
                 </div>
-                """, unsafe_allow_html=True)
-    
-    # Navigation buttons
-    st.markdown("---")
-    create_navigation_buttons()
+                """
 
-# -------------------------
-# Risk Profile Tab (UPDATED with navigation)
-# -------------------------
-def create_risk_profile_tab():
-    st.markdown('<h1 class="main-header">🎯 Risk Profile Analysis</h1>', unsafe_allow_html=True)
+    return cards
+
+def create_financial_health_tab():
+    st.markdown('<h1 class="main-header">💰 Financial Health Assessment</h1>', unsafe_allow_html=True)
     
-    if not st.session_state.assessment_complete:
+    if not st.session_state.assessment_complete or st.session_state.financial_health_score is None:
         st.warning("Please complete the assessment first!")
         st.button("Go to Assessment", on_click=lambda: setattr(st.session_state, 'current_tab', 'Assessment'))
         return
     
-    risk_scores = st.session_state.risk_scores or {}
-    risk_category = st.session_state.risk_category or "Unknown"
-    confidence_score = st.session_state.confidence_score or {'score': 0, 'level': 'LOW', 'penalties': []}
-    override_log = st.session_state.override_log or []
+    investment_data = st.session_state.safe_investment or {}
+    # Card HTML only depends on these inputs, so reruns without a new submission reuse it
+    cards = _financial_health_cards(
+        tuple(sorted(st.session_state.answers.items())),
+        tuple(sorted(st.session_state.financial_health_score.items())),
+        tuple(sorted(investment_data.items()))
+    )
     
-    # Risk Category Display
-    category_colors = {
-        "VERY LOW RISK": "#10B981",
-        "LOW RISK": "#34D399",
-        "MEDIUM RISK": "#F59E0B",
-        "HIGH RISK": "#F97316",
-        "VERY HIGH RISK": "#EF4444"
-    }
-    category_icons = {
-        "VERY LOW RISK": "🟢",
-        "LOW RISK": "🟢",
-        "MEDIUM RISK": "🟡",
-        "HIGH RISK": "🟠",
-        "VERY HIGH RISK": "🔴"
-    }
-    color = category_colors.get(risk_category, "#6B7280")
+    # Header metrics
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.markdown(cards['score'], unsafe_allow_html=True)
+    with col2:
+        st.markdown(cards['disposable'], unsafe_allow_html=True)
+    with col3:
+        st.markdown(cards['debt_ratio'], unsafe_allow_html=True)
+    with col4:
+        st.markdown(cards['savings_rate'], unsafe_allow_html=True)
     
-    col1, col2 = st.columns([2, 1])
+    # Detailed Breakdown
+    st.markdown('<h3 class="section-header">📊 Financial Health Breakdown</h3>', unsafe_allow_html=True)
+    
+    col1, col2 = st.columns(2)
     with col1:
-        st.markdown(f"""
+        st.markdown(cards['emergency'], unsafe_allow_html=True)
+        if cards['debt']:
+            st.markdown(cards['debt'], unsafe_allow_html=True)
+    with col2:
+        st.markdown(cards['income_expenses'], unsafe_allow_html=True)
+    
+    # Priority Actions
+    st.markdown('<h3 class="section-header">🎯 Priority Actions</h3>', unsafe_allow_html=True)
+    
+    if not investment_data:
+        st.warning("Investment recommendations not ready.")
+    else:
+        # Create action cards
+        for col, key in zip(st.columns(3), ('ef_action', 'debt_action', 'invest_action')):
+            if cards[key]:
+                with col:
+                    st.markdown(cards[key], unsafe_allow_html=True)
+    
+    # Navigation buttons
+    st.markdown("---")
+    create_navigation_buttons()
+
+# -------------------------
+# Risk Profile Tab (UPDATED with navigation)
+# -------------------------
+_CATEGORY_COLORS = MappingProxyType({
+    "VERY LOW RISK": "#10B981",
+    "LOW RISK": "#34D399",
+    "MEDIUM RISK": "#F59E0B",
+    "HIGH RISK": "#F97316",
+    "VERY HIGH RISK": "#EF4444"
+})
+_CATEGORY_ICONS = MappingProxyType({
+    "VERY LOW RISK": "🟢",
+    "LOW RISK": "🟢",
+    "MEDIUM RISK": "🟡",
+    "HIGH RISK": "🟠",
+    "VERY HIGH RISK": "🔴"
+})
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _risk_profile_cards(risk_category, confidence, confidence_level, risk_items):
+    """HTML for the Risk Profile category card, confidence card and score bars"""
+    risk_scores = dict(risk_items)
+    color = _CATEGORY_COLORS.get(risk_category, "#6B7280")
+    cards = {}
+
+    cards['category'] = f"""
         <div style="background-color: {color}20; padding: 1.25rem; border-radius: 10px; border-left: 5px solid {color};">
-            <h2 style="margin: 0; color: {color};">{category_icons.get(risk_category, '⚫')} {risk_category}</h2>
+            <h2 style="margin: 0; color: {color};">{_CATEGORY_ICONS.get(risk_category, '⚫')} {risk_category}</h2>
             <p style="margin: 0.5rem 0 0 0; color: #6B7280;">Based on your 90-point risk assessment</p>
         </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        conf_color = "#10B981" if confidence_score['score'] >= 80 else "#F59E0B" if confidence_score['score'] >= 60 else "#EF4444"
-        st.markdown(f"""
+        """
+
+    conf_color = "#10B981" if confidence >= 80 else "#F59E0B" if confidence >= 60 else "#EF4444"
+    cards['confidence'] = f"""
         <div class="card">
             <h4 style="margin: 0;">Confidence Score</h4>
-            <h2 style="margin: 0.4rem 0; color: {conf_color};">{confidence_score['score']}/100</h2>
-            <p style="margin: 0; color: #6B7280; font-size: 0.9rem;">{confidence_score['level']} Confidence</p>
+            <h2 style="margin: 0.4rem 0; color: {conf_color};">{confidence}/100</h2>
+            <p style="margin: 0; color: #6B7280; font-size: 0.9rem;">{confidence_level} Confidence</p>
         </div>
-        """, unsafe_allow_html=True)
-    
-    # Risk Score Breakdown
-    st.markdown('<h3 class="section-header">📊 Risk Score Breakdown (90-point system)</h3>', unsafe_allow_html=True)
-    
+        """
+
     scores = [
         ("Risk Capacity", risk_scores.get('risk_capacity', 0), 40, "#3B82F6", "Financial ability to take risk"),
         ("Risk Tolerance", risk_scores.get('risk_tolerance', 0), 30, "#10B981", "Psychological comfort with risk"),
         ("Risk Requirement", risk_scores.get('risk_requirement', 0), 20, "#8B5CF6", "Risk needed for your goals"),
         ("Total Score", risk_scores.get('total_score', 0), 90, color, "Overall risk profile")
     ]
-    
+
+    # All bars go out as one markdown block; the wrapper keeps the old 3:1 column width
+    score_bars = ['<div style="max-width: 75%;">']
     for label, score, max_score, bar_color, description in scores:
         percentage = (score / max_score) * 100 if max_score > 0 else 0
-        col1, col2 = st.columns([3, 1])
-        with col1:
-            st.markdown(f"""
+        score_bars.append(f"""
             <div style="margin-bottom: 1rem;">
                 <div style="display: flex; justify-content: space-between; margin-bottom: 0.35rem;">
                     <span style="font-weight: 600;">{label}</span>
@@ -1408,8 +1849,41 @@ def create_risk_profile_tab():
                     <div class="progress-fill" style="width: {percentage}%; background-color: {bar_color};"></div>
                 </div>
                 <p style="margin: 0.25rem 0 0 0; color: #6B7280; font-size: 0.9rem;">{description}</p>
-            </div>
-            """, unsafe_allow_html=True)
+            </div>""")
+    score_bars.append("</div>")
+    cards['score_bars'] = "".join(score_bars)
+    return cards
+
+def create_risk_profile_tab():
+    st.markdown('<h1 class="main-header">🎯 Risk Profile Analysis</h1>', unsafe_allow_html=True)
+    
+    if not st.session_state.assessment_complete:
+        st.warning("Please complete the assessment first!")
+        st.button("Go to Assessment", on_click=lambda: setattr(st.session_state, 'current_tab', 'Assessment'))
+        return
+    
+    risk_scores = st.session_state.risk_scores or {}
+    risk_category = st.session_state.risk_category or "Unknown"
+    confidence_score = st.session_state.confidence_score or {'score': 0, 'level': 'LOW', 'penalties': []}
+    override_log = st.session_state.override_log or []
+    
+    # Card HTML only depends on these inputs, so reruns without a new submission reuse it
+    cards = _risk_profile_cards(
+        risk_category, confidence_score['score'], confidence_score['level'],
+        tuple(sorted(risk_scores.items()))
+    )
+    
+    # Risk Category Display
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        st.markdown(cards['category'], unsafe_allow_html=True)
+    
+    with col2:
+        st.markdown(cards['confidence'], unsafe_allow_html=True)
+    
+    # Risk Score Breakdown
+    st.markdown('<h3 class="section-header">📊 Risk Score Breakdown (90-point system)</h3>', unsafe_allow_html=True)
+    st.markdown(cards['score_bars'], unsafe_allow_html=True)
     
     # Safety Overrides
     st.markdown('<h3 class="section-header">🛡️ Safety Overrides Applied</h3>', unsafe_allow_html=True)
@@ -1427,8 +1901,7 @@ def create_risk_profile_tab():
             <strong>Factors affecting your confidence score:</strong>
         </div>
         """, unsafe_allow_html=True)
-        for penalty in confidence_score['penalties']:
-            st.markdown(f"⚠️ {penalty}")
+        st.markdown("\n\n".join(f"⚠️ {penalty}" for penalty in confidence_score['penalties']))
     
     # Navigation buttons
     st.markdown("---")
@@ -1437,6 +1910,57 @@ def create_risk_profile_tab():
 # -------------------------
 # Recommendations Tab (UPDATED with navigation)
 # -------------------------
+_ALLOCATION_COLORS = ('#3B82F6', '#10B981', '#F59E0B', '#EF4444')
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _build_allocation_pie(alloc_items):
+    """Allocation donut chart as a plotly figure dict, rebuilt only when the allocation changes"""
+    labels = [category for category, _ in alloc_items]
+    values = [percentage for _, percentage in alloc_items]
+    colors = _ALLOCATION_COLORS[:len(labels)]
+    fig = go.Figure(data=[go.Pie(labels=labels, values=values, hole=0.4, marker_colors=colors, textinfo='label+percent')])
+    fig.update_layout(height=360, showlegend=False, margin=dict(t=0, b=0, l=0, r=0))
+    return fig.to_dict()
+
+@st.cache_data(show_spinner=False, max_entries=128)
+def _render_stock_cards(category, perc, monthly_inv):
+    """HTML for one category's row of example stock cards (up to 4)"""
+    stocks = get_stocks_by_category()[category][:4]
+    per_stock = perc / 100 * monthly_inv * (1 / len(stocks))
+    cards = [f"""
+        <div style="flex:1; min-width:0; background-color:white; padding:1rem; border-radius:8px; border:1px solid #E5E7EB; margin-bottom:0.5rem; height: 180px;">
+            <div style="display:flex; justify-content:space-between; align-items:start; margin-bottom:0.4rem;">
+                <span style="font-weight:700; font-size:1.05rem;">{stock['symbol']}</span>
+                <span style="background-color:#F3F4F6; padding:0.25rem 0.5rem; border-radius:4px; font-size:0.8rem;">{stock['market_cap']}</span>
+            </div>
+            <p style="margin:0 0 0.4rem 0; color:#1F2937; font-size:0.95rem;">{stock['name']}</p>
+            <div style="background-color:#E0F2FE; padding:0.25rem 0.5rem; border-radius:4px; display:inline-block;">
+                <span style="color:#0EA5E9; font-size:0.85rem;">{stock['sector']}</span>
+            </div>
+            <div style="margin-top:1rem; padding-top:0.5rem; border-top:1px solid #E5E7EB;">
+                <p style="margin:0; color:#6B7280; font-size:0.8rem;">Example allocation: ₹{per_stock:,.0f}/month</p>
+            </div>
+        </div>""" for stock in stocks]
+    # One flex row stands in for the st.columns split, so the whole row is a single markdown block
+    return '<div style="display:flex; gap:1rem;">' + "".join(cards) + "</div>"
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _allocation_panel(alloc_items, monthly_inv):
+    """HTML for the per-category allocation list beside the donut chart"""
+    panel = ["<div style='background-color:#F9FAFB; padding:1rem; border-radius:10px;'>"]
+    for category, percentage in alloc_items:
+        amount = (percentage / 100.0) * monthly_inv
+        panel.append(f"""
+            <div style="margin-bottom: 0.75rem; padding-bottom: 0.5rem; border-bottom: 1px solid #E5E7EB;">
+                <div style="display:flex; justify-content:space-between;">
+                    <span style="font-weight:600;">{category}</span>
+                    <span style="font-weight:600; color:#1F2937;">{percentage}%</span>
+                </div>
+                <div style="color:#6B7280; font-size:0.9rem;">₹{amount:,.0f}/month</div>
+            </div>""")
+    panel.append("</div>")
+    return "".join(panel)
+
 def create_recommendations_tab():
     st.markdown('<h1 class="main-header">💼 Stock Investment Recommendations</h1>', unsafe_allow_html=True)
     
@@ -1453,33 +1977,24 @@ def create_recommendations_tab():
     col1, col2, col3 = st.columns(3)
     with col1:
         monthly_inv = investment_data.get('safe_monthly_investment', 0.0)
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3 style="margin: 0; font-size: 1.1rem;">Monthly Investment</h3>
-            <h1 style="margin: 0.35rem 0; font-size: 2rem; color: white;">₹{monthly_inv:,.0f}</h1>
-            <p style="margin: 0;">Safe amount after priorities</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_METRIC_CARD_TMPL.format(
+            title="Monthly Investment", size="2rem", color="white", value=f"₹{monthly_inv:,.0f}",
+            subtitle="Safe amount after priorities"
+        ), unsafe_allow_html=True)
     
     with col2:
         annual_inv = investment_data.get('annual_investment', 0.0)
-        st.markdown(f"""
-        <div class="card" style="border-left-color: #10B981;">
-            <h4 style="margin: 0;">Annual Investment</h4>
-            <h2 style="margin: 0.4rem 0; color: #10B981;">₹{annual_inv:,.0f}</h2>
-            <p style="margin: 0; color: #6B7280; font-size: 0.9rem;">12 × Monthly</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_STAT_CARD_TMPL.format(
+            title="Annual Investment", color="#10B981", value=f"₹{annual_inv:,.0f}",
+            subtitle="12 × Monthly"
+        ), unsafe_allow_html=True)
     
     with col3:
         tier = investment_data.get('investment_tier', 0.0)
-        st.markdown(f"""
-        <div class="card" style="border-left-color: #8B5CF6;">
-            <h4 style="margin: 0;">Investment Tier</h4>
-            <h2 style="margin: 0.4rem 0; color: #8B5CF6;">{tier:.0f}% of Disposable</h2>
-            <p style="margin: 0; color: #6B7280; font-size: 0.9rem;">Based on financial health</p>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_STAT_CARD_TMPL.format(
+            title="Investment Tier", color="#8B5CF6", value=f"{tier:.0f}% of Disposable",
+            subtitle="Based on financial health"
+        ), unsafe_allow_html=True)
     
     # Portfolio Allocation
     st.markdown('<h3 class="section-header">📊 Stock Allocation for Your Risk Profile</h3>', unsafe_allow_html=True)
@@ -1490,29 +2005,13 @@ def create_recommendations_tab():
     
     col1, col2 = st.columns([2, 1])
     with col1:
-        # Pie chart for allocation
-        labels = list(allocation.keys())
-        values = list(allocation.values())
-        colors = ['#3B82F6', '#10B981', '#F59E0B', '#EF4444'][:len(labels)]
-        fig = go.Figure(data=[go.Pie(labels=labels, values=values, hole=0.4, marker_colors=colors, textinfo='label+percent')])
-        fig.update_layout(height=360, showlegend=False, margin=dict(t=0, b=0, l=0, r=0))
-        st.plotly_chart(fig, use_container_width=True)
+        # Pie chart for allocation (keyed in display order, which also fixes the slice colours)
+        fig_dict = _build_allocation_pie(tuple(allocation.items()))
+        st.plotly_chart(go.Figure(fig_dict), use_container_width=True)
     
     with col2:
-        st.markdown("<div style='background-color:#F9FAFB; padding:1rem; border-radius:10px;'>", unsafe_allow_html=True)
         monthly_inv = investment_data.get('safe_monthly_investment', 0.0)
-        for category, percentage in allocation.items():
-            amount = (percentage / 100.0) * monthly_inv
-            st.markdown(f"""
-            <div style="margin-bottom: 0.75rem; padding-bottom: 0.5rem; border-bottom: 1px solid #E5E7EB;">
-                <div style="display:flex; justify-content:space-between;">
-                    <span style="font-weight:600;">{category}</span>
-                    <span style="font-weight:600; color:#1F2937;">{percentage}%</span>
-                </div>
-                <div style="color:#6B7280; font-size:0.9rem;">₹{amount:,.0f}/month</div>
-            </div>
-            """, unsafe_allow_html=True)
-        st.markdown("</div>", unsafe_allow_html=True)
+        st.markdown(_allocation_panel(tuple(allocation.items()), monthly_inv), unsafe_allow_html=True)
     
     # Recommended Stocks
     st.markdown('<h3 class="section-header">💎 Recommended Stocks (Examples)</h3>', unsafe_allow_html=True)
@@ -1524,39 +2023,19 @@ def create_recommendations_tab():
     </div>
     """, unsafe_allow_html=True)
     
-    mapped_categories = []
-    for alloc_key, perc in allocation.items():
-        db_key = ALLOCATION_TO_DB.get(alloc_key, alloc_key)
-        if perc > 0 and db_key in STOCKS_DB:
-            mapped_categories.append((db_key, perc))
+    mapped_categories = [
+        (_ALLOCATION_STOCK_CATEGORIES[alloc_key], perc)
+        for alloc_key, perc in allocation.items()
+        if perc > 0 and alloc_key in _ALLOCATION_STOCK_CATEGORIES
+    ]
     
     if not mapped_categories:
         st.info("No matching stocks in the database for your allocation.")
     else:
+        # Collapsed per category, so the tab opens on the allocation summary
         for category, perc in mapped_categories:
-            st.markdown(f"### **{category}** ({perc}% allocation)")
-            stocks = STOCKS_DB.get(category, [])
-            num_to_show = min(4, len(stocks))
-            
-            cols = st.columns(num_to_show)
-            for idx, stock in enumerate(stocks[:num_to_show]):
-                with cols[idx]:
-                    st.markdown(f"""
-                    <div style="background-color:white; padding:1rem; border-radius:8px; border:1px solid #E5E7EB; margin-bottom:0.5rem; height: 180px;">
-                        <div style="display:flex; justify-content:space-between; align-items:start; margin-bottom:0.4rem;">
-                            <span style="font-weight:700; font-size:1.05rem;">{stock['symbol']}</span>
-                            <span style="background-color:#F3F4F6; padding:0.25rem 0.5rem; border-radius:4px; font-size:0.8rem;">{stock['market_cap']}</span>
-                        </div>
-                        <p style="margin:0 0 0.4rem 0; color:#1F2937; font-size:0.95rem;">{stock['name']}</p>
-                        <div style="background-color:#E0F2FE; padding:0.25rem 0.5rem; border-radius:4px; display:inline-block;">
-                            <span style="color:#0EA5E9; font-size:0.85rem;">{stock['sector']}</span>
-                        </div>
-                        <div style="margin-top:1rem; padding-top:0.5rem; border-top:1px solid #E5E7EB;">
-                            <p style="margin:0; color:#6B7280; font-size:0.8rem;">Example allocation: ₹{(perc/100 * monthly_inv * (1/num_to_show)):,.0f}/month</p>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-            st.markdown("---")
+            with st.expander(f"**{category}** ({perc}% allocation)", expanded=False):
+                st.markdown(_render_stock_cards(category, perc, monthly_inv), unsafe_allow_html=True)
     
     # Navigation buttons
     st.markdown("---")
@@ -1565,6 +2044,75 @@ def create_recommendations_tab():
 # -------------------------
 # Action Plan Tab (UPDATED with navigation)
 # -------------------------
+# Static Quarterly Review cards, side by side
+_QUARTERLY_HTML = """
+<div style="display:grid; grid-template-columns:repeat(2, minmax(0, 1fr)); gap:1rem;">
+    <div class="card">
+        <h4 style="margin:0 0 1rem 0;">📊 Portfolio Check</h4>
+        <ul style="margin:0; padding-left:1.5rem; color:#4B5563;">
+            <li>Review allocation percentages</li>
+            <li>Check if rebalancing needed (±5%)</li>
+            <li>Review stock performance</li>
+            <li>Update financial health score</li>
+        </ul>
+    </div>
+    <div class="card">
+        <h4 style="margin:0 0 1rem 0;">💰 Financial Check</h4>
+        <ul style="margin:0; padding-left:1.5rem; color:#4B5563;">
+            <li>Update income & expenses</li>
+            <li>Check emergency fund status</li>
+            <li>Review debt reduction progress</li>
+            <li>Adjust SIP if income changes</li>
+        </ul>
+    </div>
+</div>
+"""
+
+# One row of the monthly checklist
+_CHECKLIST_ROW_TMPL = "<div style='display:flex; margin-top:0.5rem;'><div style='flex:0 0 10%;'>✅</div><div>{item}</div></div>"
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _build_pdf_bytes(assessment_id, assessment_data):
+    """PDF report bytes, rendered once per assessment instead of on every rerun"""
+    return AssessmentPDF(assessment_data).generate_pdf()
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _build_assessment_json(assessment_id, results):
+    """Indented JSON report, serialized once per assessment instead of on every rerun"""
+    return json.dumps({
+        'assessment_id': assessment_id,
+        'timestamp': datetime.now().isoformat(),
+        **results
+    }, indent=2)
+
+# One Implementation Timeline step: icon, step, duration and priority cells on a 1:3:2:1 grid
+_TIMELINE_STEP_TMPL = """<div style="display:grid; grid-template-columns:minmax(0, 1fr) minmax(0, 3fr) minmax(0, 2fr) minmax(0, 1fr); gap:1rem; align-items:start; margin-bottom:1rem;">
+    <div><h1 style='margin: 0;'>{icon}</h1></div>
+    <div style="padding:0.75rem;">
+        <h4 style="margin:0 0 0.5rem 0;">{number}. {title}</h4>
+        <p style="margin:0; color:#4B5563;">{action}</p>
+    </div>
+    <div style="padding:0.75rem; background-color:#F3F4F6; border-radius:8px;">
+        <p style="margin:0; color:#6B7280; font-weight:600;">Duration</p>
+        <p style="margin:0.25rem 0 0 0; color:#1F2937; font-weight:600;">{duration}</p>
+    </div>
+    <div style="padding:0.75rem; background-color:{priority_color}10; border-radius:8px;">
+        <p style="margin:0; color:{priority_color}; font-weight:600;">{priority}</p>
+    </div>
+</div>"""
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _timeline_html(steps):
+    """HTML for the whole Implementation Timeline, one grid row per step"""
+    rows = []
+    for i, (title, duration, action, priority, icon) in enumerate(steps):
+        priority_color = "#EF4444" if "HIGH" in priority else "#F59E0B" if "MEDIUM" in priority else "#10B981"
+        rows.append(_TIMELINE_STEP_TMPL.format(
+            icon=icon, number=i + 1, title=title, action=action, duration=duration,
+            priority=priority, priority_color=priority_color
+        ))
+    return "\n".join(rows)
+
 def create_action_plan_tab():
     st.markdown('<h1 class="main-header">🚀 Your Personalized Action Plan</h1>', unsafe_allow_html=True)
     
@@ -1573,112 +2121,51 @@ def create_action_plan_tab():
         st.button("Go to Assessment", on_click=lambda: setattr(st.session_state, 'current_tab', 'Assessment'))
         return
     
-    investment_data = st.session_state.safe_investment or {}
+    state = st.session_state
+    investment_data = state.safe_investment or {}
+    ef_gap = investment_data.get('ef_gap_amount', 0)
+    ef_saving = investment_data.get('monthly_ef_saving', 0)
+    ef_months = investment_data.get('ef_build_timeline', 0)
+    debt_payment = investment_data.get('monthly_debt_payment', 0)
+    safe_investment = investment_data.get('safe_monthly_investment', 0)
     
     # Implementation Timeline
     st.markdown('<h3 class="section-header">📅 Implementation Timeline</h3>', unsafe_allow_html=True)
     
+    # (title, duration, action, priority, icon) per step
     timeline_steps = []
-    if investment_data.get('ef_gap_amount', 0) > 0:
-        timeline_steps.append({
-            "title": "Build Emergency Fund", 
-            "duration": f"{investment_data['ef_build_timeline']} months", 
-            "action": f"Save ₹{investment_data['monthly_ef_saving']:,.0f}/month", 
-            "priority": "🔴 HIGH",
-            "icon": "🛡️"
-        })
-    
-    if st.session_state.answers.get('high_interest_debt', 0) > 0:
-        timeline_steps.append({
-            "title": "Pay High-Interest Debt", 
-            "duration": "Ongoing", 
-            "action": f"Pay ₹{investment_data['monthly_debt_payment']:,.0f}/month minimum", 
-            "priority": "🟡 MEDIUM",
-            "icon": "💳"
-        })
+    if ef_gap > 0:
+        timeline_steps.append(("Build Emergency Fund", f"{ef_months} months", f"Save ₹{ef_saving:,.0f}/month", "🔴 HIGH", "🛡️"))
     
-    if investment_data.get('safe_monthly_investment', 0) > 0:
-        timeline_steps.append({
-            "title": "Start Investing", 
-            "duration": "Immediate", 
-            "action": f"Invest ₹{investment_data['safe_monthly_investment']:,.0f}/month", 
-            "priority": "🟢 LOW",
-            "icon": "📈"
-        })
-    
-    for i, step in enumerate(timeline_steps):
-        col1, col2, col3, col4 = st.columns([1, 3, 2, 1])
-        with col1:
-            st.markdown(f"<h1 style='margin: 0;'>{step['icon']}</h1>", unsafe_allow_html=True)
-        with col2:
-            st.markdown(f"""
-            <div style="padding:0.75rem;">
-                <h4 style="margin:0 0 0.5rem 0;">{i+1}. {step['title']}</h4>
-                <p style="margin:0; color:#4B5563;">{step['action']}</p>
-            </div>
-            """, unsafe_allow_html=True)
-        with col3:
-            st.markdown(f"""
-            <div style="padding:0.75rem; background-color:#F3F4F6; border-radius:8px;">
-                <p style="margin:0; color:#6B7280; font-weight:600;">Duration</p>
-                <p style="margin:0.25rem 0 0 0; color:#1F2937; font-weight:600;">{step['duration']}</p>
-            </div>
-            """, unsafe_allow_html=True)
-        with col4:
-            priority_color = "#EF4444" if "HIGH" in step['priority'] else "#F59E0B" if "MEDIUM" in step['priority'] else "#10B981"
-            st.markdown(f"""
-            <div style="padding:0.75rem; background-color:{priority_color}10; border-radius:8px;">
-                <p style="margin:0; color:{priority_color}; font-weight:600;">{step['priority']}</p>
-            </div>
-            """, unsafe_allow_html=True)
+    if state.answers.get('high_interest_debt', 0) > 0:
+        timeline_steps.append(("Pay High-Interest Debt", "Ongoing", f"Pay ₹{debt_payment:,.0f}/month minimum", "🟡 MEDIUM", "💳"))
+    
+    if safe_investment > 0:
+        timeline_steps.append(("Start Investing", "Immediate", f"Invest ₹{safe_investment:,.0f}/month", "🟢 LOW", "📈"))
+    
+    # Every step goes out in one markdown block instead of four columns per step
+    if timeline_steps:
+        st.markdown(_timeline_html(tuple(timeline_steps)), unsafe_allow_html=True)
     
     # Monthly Checklist
     st.markdown('<h3 class="section-header">✅ Monthly Checklist</h3>', unsafe_allow_html=True)
     
     checklist_items = []
-    if investment_data.get('monthly_ef_saving', 0) > 0:
-        checklist_items.append(f"Save ₹{investment_data['monthly_ef_saving']:,.0f} for emergency fund")
-    if investment_data.get('monthly_debt_payment', 0) > 0:
-        checklist_items.append(f"Pay ₹{investment_data['monthly_debt_payment']:,.0f} towards high-interest debt")
-    if investment_data.get('safe_monthly_investment', 0) > 0:
-        checklist_items.append(f"Invest ₹{investment_data['safe_monthly_investment']:,.0f} as per allocation")
+    if ef_saving > 0:
+        checklist_items.append(f"Save ₹{ef_saving:,.0f} for emergency fund")
+    if debt_payment > 0:
+        checklist_items.append(f"Pay ₹{debt_payment:,.0f} towards high-interest debt")
+    if safe_investment > 0:
+        checklist_items.append(f"Invest ₹{safe_investment:,.0f} as per allocation")
     checklist_items.append("Review monthly expenses and budget")
     checklist_items.append("Track net worth growth")
     
-    for i, item in enumerate(checklist_items):
-        col1, col2 = st.columns([0.1, 0.9])
-        with col1:
-            st.markdown(f"<div style='margin-top: 0.5rem;'>✅</div>", unsafe_allow_html=True)
-        with col2:
-            st.markdown(f"<div style='margin-top: 0.5rem;'>{item}</div>", unsafe_allow_html=True)
+    checklist_rows = "".join(_CHECKLIST_ROW_TMPL.format(item=item) for item in checklist_items)
+    st.markdown(f"<div>{checklist_rows}</div>", unsafe_allow_html=True)
     
     # Quarterly Review
     st.markdown('<h3 class="section-header">📋 Quarterly Review (Every 3 Months)</h3>', unsafe_allow_html=True)
-    col1, col2 = st.columns(2)
-    with col1:
-        st.markdown("""
-        <div class="card">
-            <h4 style="margin:0 0 1rem 0;">📊 Portfolio Check</h4>
-            <ul style="margin:0; padding-left:1.5rem; color:#4B5563;">
-                <li>Review allocation percentages</li>
-                <li>Check if rebalancing needed (±5%)</li>
-                <li>Review stock performance</li>
-                <li>Update financial health score</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
-    with col2:
-        st.markdown("""
-        <div class="card">
-            <h4 style="margin:0 0 1rem 0;">💰 Financial Check</h4>
-            <ul style="margin:0; padding-left:1.5rem; color:#4B5563;">
-                <li>Update income & expenses</li>
-                <li>Check emergency fund status</li>
-                <li>Review debt reduction progress</li>
-                <li>Adjust SIP if income changes</li>
-            </ul>
-        </div>
-        """, unsafe_allow_html=True)
+    st.markdown(_QUARTERLY_HTML, unsafe_allow_html=True)
     
     # Export Options
     st.markdown('<h3 class="section-header">📄 Export Your Plan</h3>', unsafe_allow_html=True)
@@ -1686,40 +2173,34 @@ def create_action_plan_tab():
     
     # PDF Export
     with col1:
-        if st.session_state.assessment_complete:
+        if state.assessment_complete:
             assessment_data = {
-                'answers': st.session_state.answers,
-                'financial_data': st.session_state.financial_health_score,
-                'risk_scores': st.session_state.risk_scores,
-                'risk_category': st.session_state.risk_category,
-                'override_log': st.session_state.override_log,
-                'allocation': st.session_state.allocation,
-                'contradictions': st.session_state.contradictions,
-                'investment_data': st.session_state.safe_investment,
-                'confidence_score': st.session_state.confidence_score
+                'answers': state.answers,
+                'financial_data': state.financial_health_score,
+                'risk_scores': state.risk_scores,
+                'risk_category': state.risk_category,
+                'override_log': state.override_log,
+                'allocation': state.allocation,
+                'contradictions': state.contradictions,
+                'investment_data': state.safe_investment,
+                'confidence_score': state.confidence_score
             }
             
-            pdf_generator = AssessmentPDF(assessment_data)
-            pdf_buffer = pdf_generator.generate_pdf()
-            pdf_bytes = pdf_buffer.getvalue()
-            
             st.download_button(
                 label="📥 Download PDF Report",
-                data=pdf_bytes,
-                file_name=f"Stock_Risk_Advisor_Plan_{st.session_state.assessment_id}.pdf",
+                data=_build_pdf_bytes(state.assessment_id, assessment_data),
+                file_name=f"Stock_Risk_Advisor_Plan_{state.assessment_id}.pdf",
                 mime="application/pdf",
                 use_container_width=True
             )
     
     # CSV Export
     with col2:
-        if os.path.exists(CSV_FILE):
-            with open(CSV_FILE, 'r') as file:
-                csv_data = file.read()
-            
+        signature = _csv_signature()
+        if signature is not None:
             st.download_button(
                 label="📊 Download All Data CSV",
-                data=csv_data,
+                data=_read_csv_bytes(signature),
                 file_name="all_assessments.csv",
                 mime="text/csv",
                 use_container_width=True
@@ -1727,22 +2208,20 @@ def create_action_plan_tab():
     
     # JSON Export
     with col3:
-        if st.session_state.assessment_complete:
-            assessment_json = json.dumps({
-                'assessment_id': st.session_state.assessment_id,
-                'timestamp': datetime.now().isoformat(),
-                'answers': st.session_state.answers,
-                'financial_health_score': st.session_state.financial_health_score,
-                'risk_scores': st.session_state.risk_scores,
-                'risk_category': st.session_state.risk_category,
-                'safe_investment': st.session_state.safe_investment,
-                'allocation': st.session_state.allocation
-            }, indent=2)
+        if state.assessment_complete:
+            assessment_json = _build_assessment_json(state.assessment_id, {
+                'answers': state.answers,
+                'financial_health_score': state.financial_health_score,
+                'risk_scores': state.risk_scores,
+                'risk_category': state.risk_category,
+                'safe_investment': state.safe_investment,
+                'allocation': state.allocation
+            })
             
             st.download_button(
                 label="📁 Download JSON Report",
                 data=assessment_json,
-                file_name=f"assessment_{st.session_state.assessment_id}.json",
+                file_name=f"assessment_{state.assessment_id}.json",
                 mime="application/json",
                 use_container_width=True
             )
@@ -1752,21 +2231,72 @@ def create_action_plan_tab():
     create_navigation_buttons()
     
     st.markdown("### Want to start over?")
-    if st.button("🔄 Start New Assessment", type="secondary", use_container_width=True):
-        for key in list(st.session_state.keys()):
-            del st.session_state[key]
-        init_session_state()
-        st.rerun()
+    st.button("🔄 Start New Assessment", type="secondary", use_container_width=True,
+              on_click=_start_new_assessment)
 
 # -------------------------
 # Data & Export Tab
 # -------------------------
+# Derived views of the stored assessments, keyed on the same CSV signature as
+# _read_assessments_csv so they are rebuilt only when the file changes
+@st.cache_data(show_spinner=False, max_entries=1)
+def _data_tab_summary(signature):
+    """(total, avg health, avg monthly investment, most common risk) for the metric row"""
+    # Same reductions as the sidebar statistics, so reuse them
+    stats = _assessment_statistics(signature)
+    return (
+        stats['total_assessments'],
+        f"{stats['avg_financial_health']:.1f}",
+        f"₹{stats['avg_monthly_investment']:,.0f}",
+        stats['most_common_risk_category']
+    )
+
+# Display formatters for the money columns of the recent-assessments table
+_RECENT_COLUMN_FORMATS = {
+    'monthly_income': "₹{:,.0f}".format,
+    'monthly_expenses': "₹{:,.0f}".format,
+    'monthly_investment': "₹{:,.0f}".format,
+}
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def _recent_assessments_display(signature, rows):
+    """Formatted table of the `rows` most recent assessments, newest first"""
+    # Only the tail slice is sorted, not the whole history
+    recent_df = _read_assessments_csv(signature).iloc[-rows:].sort_values('timestamp', ascending=False)
+    
+    display_df = recent_df[['timestamp', 'monthly_income', 'monthly_expenses', 
+                           'financial_health_score', 'risk_category', 'monthly_investment']]
+    formatted = {col: display_df[col].map(fmt) for col, fmt in _RECENT_COLUMN_FORMATS.items()}
+    formatted['timestamp'] = display_df['timestamp'].dt.strftime('%Y-%m-%d %H:%M')
+    return display_df.assign(**formatted)
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def _data_tab_charts(signature):
+    """Risk-category pie and health-score histogram as plotly figure dicts"""
+    # plotly.express is much heavier to import than graph_objects and only used here
+    import plotly.express as px
+    
+    df = _read_assessments_csv(signature)
+    risk_counts = df['risk_category'].value_counts()
+    fig1 = px.pie(values=risk_counts.values, names=risk_counts.index, 
+                 title="Risk Category Distribution")
+    fig2 = px.histogram(df, x='financial_health_score', nbins=20,
+                       title="Financial Health Score Distribution")
+    return fig1.to_dict(), fig2.to_dict()
+
+@st.cache_data(show_spinner=False, max_entries=1)
+def _summary_stats_text(signature):
+    """describe() table of the numeric columns, as offered by the summary-stats download"""
+    return _read_assessments_csv(signature).describe(include='number').to_string()
+
 def create_data_export_tab():
     st.markdown('<h1 class="main-header">📊 Data Management & Export</h1>', unsafe_allow_html=True)
     
-    df = CSVDataHandler.load_assessments_from_csv()
+    # No file, or nothing past the header: skip pandas entirely
+    signature = _csv_signature()
+    df = CSVDataHandler.load_assessments_from_csv() if signature and signature[1] > _CSV_HEADER_SIZE else None
     
-    if df.empty:
+    if df is None or df.empty:
         st.info("No assessment data available yet. Complete an assessment to see data here.")
         st.button("Go to Assessment", on_click=lambda: setattr(st.session_state, 'current_tab', 'Assessment'))
         return
@@ -1774,47 +2304,35 @@ def create_data_export_tab():
     # Statistics
     st.markdown('<h3 class="section-header">📈 Assessment Statistics</h3>', unsafe_allow_html=True)
     
+    total, avg_health, avg_investment, most_common_risk = _data_tab_summary(signature)
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Total Assessments", len(df))
+        st.metric("Total Assessments", total)
     with col2:
-        st.metric("Avg Financial Health", f"{df['financial_health_score'].mean():.1f}")
+        st.metric("Avg Financial Health", avg_health)
     with col3:
-        st.metric("Avg Monthly Investment", f"₹{df['monthly_investment'].mean():,.0f}")
+        st.metric("Avg Monthly Investment", avg_investment)
     with col4:
-        most_common_risk = df['risk_category'].mode().iloc[0] if not df['risk_category'].mode().empty else 'N/A'
         st.metric("Most Common Risk", most_common_risk)
     
     # Recent Assessments
     st.markdown('<h3 class="section-header">📋 Recent Assessments</h3>', unsafe_allow_html=True)
     
-    recent_df = df.tail(10).copy()
-    recent_df['timestamp'] = pd.to_datetime(recent_df['timestamp'])
-    recent_df = recent_df.sort_values('timestamp', ascending=False)
-    
-    display_df = recent_df[['timestamp', 'monthly_income', 'monthly_expenses', 
-                           'financial_health_score', 'risk_category', 'monthly_investment']].copy()
-    display_df['monthly_income'] = display_df['monthly_income'].apply(lambda x: f"₹{x:,.0f}")
-    display_df['monthly_expenses'] = display_df['monthly_expenses'].apply(lambda x: f"₹{x:,.0f}")
-    display_df['monthly_investment'] = display_df['monthly_investment'].apply(lambda x: f"₹{x:,.0f}")
-    display_df['timestamp'] = display_df['timestamp'].dt.strftime('%Y-%m-%d %H:%M')
+    rows = st.number_input("Rows to show", min_value=1, max_value=total, value=min(10, total), step=1)
+    display_df = _recent_assessments_display(signature, int(rows))
     
-    st.dataframe(display_df, use_container_width=True)
+    st.table(display_df)
     
     # Visualizations
     st.markdown('<h3 class="section-header">📊 Data Visualizations</h3>', unsafe_allow_html=True)
     
+    risk_pie, health_hist = _data_tab_charts(signature)
     col1, col2 = st.columns(2)
     with col1:
-        risk_counts = df['risk_category'].value_counts()
-        fig1 = px.pie(values=risk_counts.values, names=risk_counts.index, 
-                     title="Risk Category Distribution")
-        st.plotly_chart(fig1, use_container_width=True)
+        st.plotly_chart(go.Figure(risk_pie), use_container_width=True)
     
     with col2:
-        fig2 = px.histogram(df, x='financial_health_score', nbins=20,
-                           title="Financial Health Score Distribution")
-        st.plotly_chart(fig2, use_container_width=True)
+        st.plotly_chart(go.Figure(health_hist), use_container_width=True)
     
     # Export Options
     st.markdown('<h3 class="section-header">📁 Export Options</h3>', unsafe_allow_html=True)
@@ -1822,20 +2340,19 @@ def create_data_export_tab():
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        csv = df.to_csv(index=False)
+        # The file on disk already holds exactly these rows; no pandas re-serialization
         st.download_button(
             label="📊 Download Full CSV",
-            data=csv,
+            data=_read_csv_bytes(signature),
             file_name="all_assessments_full.csv",
             mime="text/csv",
             use_container_width=True
         )
     
     with col2:
-        summary_stats = df.describe().to_string()
         st.download_button(
             label="📈 Download Summary Stats",
-            data=summary_stats,
+            data=_summary_stats_text(signature),
             file_name="assessment_summary.txt",
             mime="text/plain",
             use_container_width=True
@@ -1848,7 +2365,17 @@ def create_data_export_tab():
             with col_confirm:
                 if st.button("Yes, Delete All Data"):
                     try:
+                        _close_csv_appender()
                         os.remove(CSV_FILE)
+                        # Start the new file with its header; _init_storage only runs once
+                        _ensure_csv_header()
+                        # Drop cached frames for the deleted file
+                        for cached in (_read_assessments_csv, _read_csv_bytes, _assessment_statistics,
+                                       _data_tab_summary, _recent_assessments_display, _data_tab_charts,
+                                       _summary_stats_text):
+                            cached.clear()
+                        # This session's saved row went with the file; resubmitting records it again
+                        st.session_state.answers_key = None
                         st.success("All assessment data has been cleared!")
                         st.rerun()
                     except Exception as e:
@@ -1865,6 +2392,11 @@ def create_data_export_tab():
 # MAIN FUNCTION
 # -------------------------
 def main():
+    # Apply a pending redirect before the radio bound to current_tab is created
+    if st.session_state.next_tab is not None:
+        st.session_state.current_tab, st.session_state.next_tab = st.session_state.next_tab, None
+    report_pending_save()
+    
     # Sidebar
     with st.sidebar:
         st.image("https://img.icons8.com/color/96/000000/stock-exchange.png", width=80)
@@ -1872,21 +2404,18 @@ def main():
         st.markdown("---")
         
         st.subheader("📊 Navigation")
-        tabs = ["Welcome", "Assessment", "Financial Health", "Risk Profile", "Recommendations", "Action Plan", "Data & Export"]
-        for tab in tabs:
-            if st.button(f"📝 {tab}", key=f"nav_{tab}", use_container_width=True):
-                st.session_state.current_tab = tab
-                st.rerun()
+        # Bound to current_tab, so buttons and callbacks that set the tab move the radio too
+        st.radio(
+            "Navigation", TABS, key="current_tab",
+            format_func=lambda tab: f"📝 {tab}",
+            label_visibility="collapsed"
+        )
         
         st.markdown("---")
         
         if st.session_state.assessment_complete:
             st.success("✅ Assessment Complete")
-            if st.button("🔄 Start New Assessment", use_container_width=True):
-                for key in list(st.session_state.keys()):
-                    del st.session_state[key]
-                init_session_state()
-                st.rerun()
+            st.button("🔄 Start New Assessment", use_container_width=True, on_click=_start_new_assessment)
         else:
             st.info("📋 Complete assessment to see results")
         
@@ -0,0 +1,159 @@
+import importlib
+import os
+import subprocess
+import sys
+import textwrap
+import threading
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """deep.py imported in bare mode, storing its CSV under tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(REPO_DIR)
+    deep = importlib.import_module("deep")
+    # The module (and its cached descriptor) may come from an earlier test's directory
+    deep._get_csv_appender.clear()
+    deep._ensure_csv_header()
+    return deep
+
+
+def run_app_script(tmp_path, body):
+    """Import deep.py in bare mode from tmp_path, run body, and let the interpreter exit"""
+    script = textwrap.dedent(f"""
+        import sys, time
+        sys.path.insert(0, {REPO_DIR!r})
+        import deep
+    """) + textwrap.dedent(body)
+    return subprocess.run([sys.executable, "-c", script], cwd=tmp_path,
+                          capture_output=True, text=True, timeout=120)
+
+
+def csv_rows(tmp_path):
+    with open(tmp_path / "assessments_data.csv", newline="") as file:
+        return file.read().split("\r\n")[1:-1]
+
+
+def test_rows_queued_at_exit_are_written(tmp_path):
+    result = run_app_script(tmp_path, """
+        # Slow writes so the rows are still queued when the interpreter starts shutting down
+        append = deep._append_to_csv
+        def slow_append(appender, data):
+            time.sleep(0.3)
+            append(appender, data)
+        deep._append_to_csv = slow_append
+        for _ in range(3):
+            deep.CSVDataHandler.save_assessment_to_csv({'answers': {}})
+    """)
+    assert result.returncode == 0, result.stderr
+    assert len(csv_rows(tmp_path)) == 3
+
+
+def test_failed_write_is_reported_to_its_own_save(app, tmp_path, monkeypatch):
+    append = app._append_to_csv
+    def failing_append(appender, data):
+        raise OSError("disk full")
+    monkeypatch.setattr(app, "_append_to_csv", failing_append)
+    failed = app.CSVDataHandler.save_assessment_to_csv({'answers': {}})
+    assert isinstance(failed.exception(timeout=10), OSError)
+
+    # The next submission is unaffected by the earlier failure
+    monkeypatch.setattr(app, "_append_to_csv", append)
+    saved = app.CSVDataHandler.save_assessment_to_csv({'answers': {}})
+    assert saved.result(timeout=10) is True
+    assert len(csv_rows(tmp_path)) == 1
+
+
+def test_save_queued_after_clear_fails_instead_of_vanishing(app):
+    appender = app._get_csv_appender()
+    app._release_csv_fd(appender)
+    future = app.CSVDataHandler.save_assessment_to_csv({'answers': {}})
+    assert isinstance(future.exception(timeout=10), OSError)
+
+
+def test_coalesced_saves_each_resolve_and_keep_their_order(app, tmp_path, monkeypatch):
+    append = app._append_to_csv
+    release = threading.Event()
+    writes = []
+    def held_append(appender, data):
+        release.wait(10)
+        writes.append(data)
+        append(appender, data)
+    monkeypatch.setattr(app, "_append_to_csv", held_append)
+
+    # The first save holds the writer; the other four queue up behind it
+    futures = [app.CSVDataHandler.save_assessment_to_csv({'answers': {'age': age}}) for age in range(1, 6)]
+    release.set()
+    assert [future.result(timeout=10) for future in futures] == [True] * 5
+    assert len(writes) < 5
+    assert [row.split(",")[5] for row in csv_rows(tmp_path)] == ["1", "2", "3", "4", "5"]
+
+
+def test_coalesced_batch_queued_at_exit_is_written(tmp_path):
+    result = run_app_script(tmp_path, """
+        import atexit
+        # Registered before the writer's hook, so it runs after the queue has drained
+        atexit.register(lambda: print("writes", len(writes)))
+        append = deep._append_to_csv
+        writes = []
+        def slow_append(appender, data):
+            time.sleep(0.3)
+            writes.append(data)
+            append(appender, data)
+        deep._append_to_csv = slow_append
+        for _ in range(5):
+            deep.CSVDataHandler.save_assessment_to_csv({'answers': {}})
+    """)
+    assert result.returncode == 0, result.stderr
+    assert len(csv_rows(tmp_path)) == 5
+    assert int(result.stdout.split("writes")[-1]) < 5
+
+
+LEGACY_CSV = (
+    "timestamp,monthly_income,monthly_expenses,emergency_fund,high_interest_debt,age_group,"
+    "investment_purpose,time_horizon,risk_behavior,experience,goal_priority,loss_capacity,"
+    "liquidity_need,financial_health_score,risk_category,total_risk_score,monthly_investment,"
+    "annual_investment,confidence_score\r\n"
+    "2025-12-10 14:49:13,50000.0,30000.0,3,0.0,3,4,3,3,2,2,2,2,86.0,LOW RISK,59.13,8000.0,96000.0,90\r\n"
+    "2025-12-12 20:16:12,30000.0,17000.0,,4000.0,4,5,2,4,2,3,2,2,78.72,LOW RISK,64.67,3900.0,46800.0,\r\n"
+)
+
+
+def test_legacy_rows_with_empty_cells_and_missing_columns_load(app, tmp_path):
+    (tmp_path / "assessments_data.csv").write_text(LEGACY_CSV, newline="")
+
+    df = app.CSVDataHandler.load_assessments_from_csv()
+    assert len(df) == 2
+    assert df['emergency_fund'].isna().tolist() == [False, True]
+    assert df['portfolio_growth'].isna().all()
+
+    stats = app.CSVDataHandler.get_statistics()
+    assert stats['total_assessments'] == 2
+    assert stats['most_common_risk_category'] == "LOW RISK"
+
+
+def test_malformed_timestamp_becomes_nat_and_recent_table_still_renders(app, tmp_path):
+    (tmp_path / "assessments_data.csv").write_text(LEGACY_CSV.replace("2025-12-12 20:16:12", "12/12/2025"), newline="")
+
+    df = app.CSVDataHandler.load_assessments_from_csv()
+    assert df['timestamp'].isna().tolist() == [False, True]
+
+    recent = app._recent_assessments_display(app._csv_signature(), 10)
+    assert recent['timestamp'].tolist()[0] == "2025-12-10 14:49"
+
+
+def test_report_of_a_stalled_save_waits_boundedly_and_retries_later(app, monkeypatch):
+    monkeypatch.setattr(app, "SAVE_REPORT_TIMEOUT", 0.1)
+    app.init_session_state()
+    stalled = app.Future()
+    app.st.session_state.pending_save = ((), stalled)
+    app.report_pending_save()
+    assert app.st.session_state.pending_save == ((), stalled)
+
+    stalled.set_result(True)
+    app.report_pending_save()
+    assert app.st.session_state.pending_save is None
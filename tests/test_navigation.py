@@ -0,0 +1,85 @@
+import os
+from concurrent.futures import Future
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+APP_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "deep.py")
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """deep.py under AppTest, storing its CSV under tmp_path"""
+    monkeypatch.chdir(tmp_path)
+    # Caches outlive an AppTest; start each test on its own directory's CSV
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    at = AppTest.from_file(APP_FILE, default_timeout=60)
+    at.run()
+    return at
+
+
+def submit_assessment(at):
+    [button for button in at.button if "Calculate My" in button.label][0].click()
+    at.run()
+
+
+def test_consecutive_sidebar_clicks_each_switch_tab(app):
+    for tab in ("Assessment", "Risk Profile", "Action Plan", "Data & Export", "Welcome", "Assessment"):
+        app.radio[0].set_value(tab)
+        app.run()
+        assert not app.exception
+        assert app.session_state.current_tab == tab
+        assert app.radio[0].value == tab
+
+
+def test_submit_and_unchanged_resubmit_open_financial_health(app):
+    app.radio[0].set_value("Assessment")
+    app.run()
+    submit_assessment(app)
+    assert not app.exception
+    assert app.session_state.current_tab == "Financial Health"
+    assert app.radio[0].value == "Financial Health"
+
+    app.radio[0].set_value("Assessment")
+    app.run()
+    submit_assessment(app)
+    assert app.session_state.current_tab == "Financial Health"
+    assert app.radio[0].value == "Financial Health"
+
+
+def test_buttons_and_radio_stay_in_step(app):
+    [button for button in app.button if "Begin Assessment" in button.label][0].click()
+    app.run()
+    assert app.radio[0].value == "Assessment"
+    submit_assessment(app)
+
+    [button for button in app.button if "Next" in button.label][0].click()
+    app.run()
+    assert app.radio[0].value == "Risk Profile"
+
+    app.radio[0].set_value("Recommendations")
+    app.run()
+    assert app.session_state.current_tab == "Recommendations"
+
+
+def test_unchanged_resubmit_after_a_failed_save_saves_again(app, tmp_path):
+    app.radio[0].set_value("Assessment")
+    app.run()
+    submit_assessment(app)
+    # Stand in for a save that failed: this run reports it without marking the answers saved
+    answers_key, app.session_state.answers_key = app.session_state.answers_key, None
+    failed = Future()
+    failed.set_exception(OSError("disk full"))
+    app.session_state.pending_save = (answers_key, failed)
+    app.run()
+    assert "disk full" in app.error[0].value
+
+    app.radio[0].set_value("Assessment")
+    app.run()
+    submit_assessment(app)
+    assert not app.error
+    assert app.session_state.answers_key == answers_key
+    with open(tmp_path / "assessments_data.csv", newline="") as file:
+        assert len(file.read().split("\r\n")[1:-1]) == 2